@@ -0,0 +1,108 @@
+"""
+Compare the JSON backends on realistic ``/_sql`` response shapes, and on
+bulk insert payloads.
+
+Backends whose packages are not installed are skipped::
+
+    python benchmarks/json_backends.py
+"""
+
+import argparse
+import datetime as dt
+import random
+import timeit
+from functools import partial
+
+from crate.client.serialization import JSON_BACKENDS, json_dumps
+
+
+def response(cols, rows, value):
+    return json_dumps(
+        {
+            "cols": [f"col_{i}" for i in range(cols)],
+            "col_types": [10] * cols,
+            "rows": [[value(row, col) for col in range(cols)] for row in rows],
+            "rowcount": len(rows),
+            "duration": 1.5,
+        }
+    )
+
+
+def mixed(row, col):
+    kind = col % 6
+    if kind == 0:
+        return row * col
+    if kind == 1:
+        return row / (col + 1)
+    if kind == 2:
+        return f"text-{row}-{col}"
+    if kind == 3:
+        return 1_700_000_000_000 + row
+    if kind == 4:
+        return None if row % 3 else True
+    return {"x": row, "tags": ["a", "b"], "loc": [9.74, 47.4]}
+
+
+SHAPES = {
+    "point query, 1x5": response(5, range(1), mixed),
+    "narrow, 10000x5": response(5, range(10_000), mixed),
+    "wide, 1000x200": response(200, range(1_000), mixed),
+    "numeric, 10000x20": response(
+        20,
+        range(10_000),
+        lambda row, col: random.random(),  # noqa: S311
+    ),
+}
+
+PAYLOADS = {
+    "bulk insert, 1000x10": {
+        "stmt": "INSERT INTO t VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        "bulk_args": [
+            [i, f"name-{i}", i / 3, dt.datetime(2024, 1, 1), None] * 2
+            for i in range(1_000)
+        ],
+    },
+}
+
+
+def available_backends():
+    backends = {}
+    for name, factory in JSON_BACKENDS.items():
+        try:
+            backends[name] = factory()
+        except ImportError:
+            print(f"Skipping {name}, not installed")
+    return backends
+
+
+def best_of(repeat, fn, *args):
+    """
+    Return the fastest of `repeat` runs of `fn`, in milliseconds.
+    """
+    return min(timeit.repeat(partial(fn, *args), number=1, repeat=repeat)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    header = "".join(f"{name:>12}" for name in backends)
+    print(f"\n{'decode (ms)':<24}{header}")
+    for shape, content in SHAPES.items():
+        timings = [
+            best_of(args.repeat, b.loads, content) for b in backends.values()
+        ]
+        print(f"{shape:<24}" + "".join(f"{t:>12.3f}" for t in timings))
+
+    print(f"\n{'encode (ms)':<24}{header}")
+    for shape, payload in PAYLOADS.items():
+        timings = [
+            best_of(args.repeat, b.dumps, payload) for b in backends.values()
+        ]
+        print(f"{shape:<24}" + "".join(f"{t:>12.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
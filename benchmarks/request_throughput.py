@@ -0,0 +1,75 @@
+"""
+Measure the client CPU time spent per request, for small point queries
+against a local stub of the CrateDB HTTP API.
+
+Besides the end-to-end throughput, the throughput of preparing requests in
+``Server.request`` is measured in isolation, by not sending them at all.
+
+Run it from the root of the repository, e.g. before and after a change::
+
+    python benchmarks/request_throughput.py --requests 20000
+"""
+
+import argparse
+import time
+from unittest import mock
+
+from stub import serve_stub
+
+from crate.client import connect
+from crate.client.http import Server
+
+SCENARIOS = {
+    "anonymous": {},
+    "credentials": {"username": "crate", "password": "secret"},
+    "credentials and schema": {"username": "crate", "schema": "doc"},
+}
+
+
+def end_to_end(url, requests, **connect_kwargs):
+    with connect(url, **connect_kwargs) as connection:
+        cursor = connection.cursor()
+        # Warm up the connection pool.
+        for _ in range(100):
+            cursor.execute("SELECT 1")
+        cpu = time.process_time()
+        for _ in range(requests):
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        return requests / (time.process_time() - cpu)
+
+
+def prepare_only(url, requests, **kwargs):
+    server = Server(url + "/prefix")
+    data = b'{"stmt": "SELECT 1"}'
+    headers = {"Accept-Encoding": "gzip, deflate"}
+    with mock.patch.object(server.pool, "urlopen", lambda *a, **kw: None):
+        cpu = time.process_time()
+        for _ in range(requests):
+            server.request(
+                "POST",
+                "/_sql?types=true",
+                data=data,
+                headers=dict(headers),
+                backoff_factor=0.1,
+                **kwargs,
+            )
+        return requests / (time.process_time() - cpu)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+
+    with serve_stub() as url:
+        print(f"{'scenario':<24} {'end-to-end':>14} {'prepare only':>14}")
+        print(f"{'':<24} {'req/s per core':>14} {'req/s per core':>14}")
+        for name, kwargs in SCENARIOS.items():
+            total = end_to_end(url, args.requests, **kwargs)
+            prepare = prepare_only(url, args.requests * 10, **kwargs)
+            print(f"{name:<24} {total:>14,.0f} {prepare:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
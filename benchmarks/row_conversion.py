@@ -0,0 +1,101 @@
+"""
+Compare converting result rows value by value with the compiled row
+converters, and with converting them column by column, on results with
+mixed column types::
+
+    python benchmarks/row_conversion.py --rows 1000000
+"""
+
+import argparse
+import timeit
+from functools import partial
+
+from crate.client.converter import DefaultTypeConverter, convert_columns
+
+# TEXT, BIGINT, DOUBLE, TIMESTAMP WITH TIME ZONE, IP, ARRAY(INTEGER), BOOLEAN
+MIXED = [4, 10, 6, 11, 5, [100, 9], 3]
+# TEXT, BIGINT, DOUBLE, OBJECT, BOOLEAN
+PASSTHROUGH = [4, 10, 6, 12, 3]
+
+
+def mixed_row(i):
+    return [
+        f"name-{i}",
+        i,
+        i / 3,
+        1_700_000_000_000 + i,
+        "10.0.0.1",
+        [1, 2, 3],
+        bool(i % 2),
+    ]
+
+
+def passthrough_row(i):
+    return [f"name-{i}", i, i / 3, {"x": i}, bool(i % 2)]
+
+
+def convert_by_value(converter, col_types, rows):
+    converters = [converter.get(type_) for type_ in col_types]
+    return [
+        [
+            convert(value)
+            for convert, value in zip(converters, row, strict=False)
+        ]
+        for row in rows
+    ]
+
+
+def convert_compiled(converter, col_types, rows):
+    convert_row = converter.row_converter(col_types)
+    if convert_row is None:
+        return list(rows)
+    return list(map(convert_row, rows))
+
+
+def convert_columnar(converter, col_types, rows):
+    column_converters = converter.column_converters(col_types)
+    if column_converters is None:
+        return list(rows)
+    return convert_columns(column_converters, rows)
+
+
+def best_of(repeat, fn, *args):
+    """
+    Return the fastest of `repeat` runs of `fn`, in milliseconds.
+    """
+    return min(timeit.repeat(partial(fn, *args), number=1, repeat=repeat)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    converter = DefaultTypeConverter()
+    shapes = {
+        "mixed": (MIXED, [mixed_row(i) for i in range(args.rows)]),
+        "passthrough": (
+            PASSTHROUGH,
+            [passthrough_row(i) for i in range(args.rows)],
+        ),
+    }
+
+    print(
+        f"{args.rows} rows (ms){'by value':>26}{'compiled':>12}{'columnar':>12}"
+    )
+    for shape, (col_types, rows) in shapes.items():
+        by_value = best_of(
+            args.repeat, convert_by_value, converter, col_types, rows
+        )
+        compiled = best_of(
+            args.repeat, convert_compiled, converter, col_types, rows
+        )
+        columnar = best_of(
+            args.repeat, convert_columnar, converter, col_types, rows
+        )
+        print(f"{shape:<30}{by_value:>12.1f}{compiled:>12.1f}{columnar:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+A local stub of the CrateDB HTTP API, returning a fixed response body.
+
+The stub runs in a separate process, so that the CPU time measured by the
+benchmarks is spent by the client only.
+"""
+
+import multiprocessing
+import socket
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import orjson
+
+SELECT_ONE = orjson.dumps(
+    {
+        "cols": ["x"],
+        "col_types": [9],
+        "rows": [[1]],
+        "rowcount": 1,
+        "duration": 0.1,
+    }
+)
+SERVER_INFO = orjson.dumps({"name": "stub", "version": {"number": "6.0.0"}})
+
+
+def _serve(sock, body):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self.respond(SERVER_INFO)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self.respond(body)
+
+        def respond(self, content):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer(
+        sock.getsockname(), Handler, bind_and_activate=False
+    )
+    server.socket = sock
+    server.serve_forever()
+
+
+@contextmanager
+def serve_stub(body=SELECT_ONE):
+    """
+    Serve the given response body for all ``POST`` requests, and yield the
+    url of the stub.
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(128)
+    host, port = sock.getsockname()
+    process = multiprocessing.Process(
+        target=_serve, args=(sock, body), daemon=True
+    )
+    process.start()
+    sock.close()
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        process.terminate()
+        process.join()
@@ -0,0 +1,80 @@
+"""
+Compare converting ``TIMESTAMP`` values using ``datetime.fromtimestamp`` per
+value with the converters returned by ``timestamp_converter``, for UTC,
+fixed-offset, ``zoneinfo`` and ``pytz`` time zones::
+
+    python benchmarks/timestamp_conversion.py --values 1000000
+"""
+
+import argparse
+import datetime as dt
+import timeit
+import zoneinfo
+from functools import partial
+
+from crate.client.converter import timestamp_converter
+
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+
+def time_zones():
+    zones = {
+        "UTC": dt.timezone.utc,
+        "fixed offset": dt.timezone(dt.timedelta(hours=7), name="MST"),
+        "ZoneInfo": zoneinfo.ZoneInfo("Europe/Berlin"),
+    }
+    if pytz is not None:
+        zones["pytz"] = pytz.timezone("Europe/Berlin")
+    else:
+        print("Skipping pytz, not installed")
+    return zones
+
+
+def convert_by_value(tz, values):
+    # The converter formerly installed by `Cursor.time_zone`.
+    return [
+        None if value is None else dt.datetime.fromtimestamp(value / 1e3, tz=tz)
+        for value in values
+    ]
+
+
+def convert_each(tz, values):
+    convert = timestamp_converter(tz)
+    return [convert(value) for value in values]
+
+
+def convert_column(tz, values):
+    return timestamp_converter(tz).convert_column(values)
+
+
+def best_of(repeat, fn, *args):
+    """
+    Return the fastest of `repeat` runs of `fn`, in milliseconds.
+    """
+    return min(timeit.repeat(partial(fn, *args), number=1, repeat=repeat)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--values", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # A time series spanning about a year, one value every 30 seconds.
+    values = [1_700_000_000_000 + i * 30_000 for i in range(args.values)]
+
+    label = f"{args.values} values (ms)"
+    print(f"{label:<24}{'fromtimestamp':>14}{'converter':>14}{'column':>14}")
+    for name, tz in time_zones().items():
+        timings = [
+            best_of(args.repeat, fn, tz, values)
+            for fn in (convert_by_value, convert_each, convert_column)
+        ]
+        print(f"{name:<24}" + "".join(f"{t:>14.1f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
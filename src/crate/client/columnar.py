@@ -0,0 +1,328 @@
+# -*- coding: utf-8; -*-
+#
+# Licensed to CRATE Technology GmbH ("Crate") under one or more contributor
+# license agreements.  See the NOTICE file distributed with this work for
+# additional information regarding copyright ownership.  Crate licenses
+# this file to you under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.  You may
+# obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# However, if you have executed another commercial license agreement
+# with Crate these terms will supersede the license and you may use the
+# software solely pursuant to the terms of the relevant commercial agreement.
+"""
+Column-wise conversion of result rows to NumPy arrays, Arrow tables and
+pandas data frames, and of columns to bulk arguments.
+
+NumPy, PyArrow and pandas are optional dependencies, imported on first use.
+"""
+
+import importlib
+import typing as t
+
+from crate.client.converter import ColTypesDefinition, Converter, DataType
+from crate.client.exceptions import ProgrammingError
+
+# Map data type identifiers to NumPy dtypes. Values of other types are
+# returned as arrays of Python objects.
+NUMPY_DTYPES = {
+    DataType.BOOLEAN: "bool",
+    DataType.CHAR: "int8",
+    DataType.SMALLINT: "int16",
+    DataType.INTEGER: "int32",
+    DataType.BIGINT: "int64",
+    DataType.REAL: "float32",
+    DataType.DOUBLE: "float64",
+    DataType.TIMESTAMP_WITH_TZ: "datetime64[ms]",
+    DataType.TIMESTAMP_WITHOUT_TZ: "datetime64[ms]",
+    DataType.DATE: "datetime64[ms]",
+}
+
+
+# Map data type identifiers to the names of Arrow type factories. Values of
+# other types are converted using the types inferred by Arrow.
+ARROW_TYPES = {
+    DataType.NULL: "null",
+    DataType.BOOLEAN: "bool_",
+    DataType.CHAR: "int8",
+    DataType.SMALLINT: "int16",
+    DataType.INTEGER: "int32",
+    DataType.BIGINT: "int64",
+    DataType.REAL: "float32",
+    DataType.DOUBLE: "float64",
+    DataType.TEXT: "string",
+    DataType.CHARACTER: "string",
+    DataType.IP: "string",
+    DataType.DATE: "date64",
+}
+
+
+# NumPy dtypes `orjson` serializes natively, by kind of values. Bulk
+# arguments are sent as a single two-dimensional array, when all columns
+# have the same kind, so that integers do not turn into floats.
+STACKABLE_DTYPES = {
+    "b": ("bool",),
+    "i": ("int8", "int16", "int32", "int64"),
+    "u": ("uint8", "uint16", "uint32", "uint64"),
+    "f": ("float32", "float64"),
+}
+
+
+# Number of rows built at a time, from columns which can not be stacked.
+BULK_ARGS_CHUNK_SIZE = 10_000
+
+
+def _import(module: str, feature: str, package: str, extra: str):
+    try:
+        return importlib.import_module(module)
+    except ImportError as ex:
+        raise ImportError(
+            f"{feature} requires {package}, install it using "
+            f"`pip install 'crate[{extra}]'`"
+        ) from ex
+
+
+def _transpose(
+    cols: t.Sequence[str], rows: t.Sequence[t.Sequence[t.Any]]
+) -> t.Sequence[t.Sequence[t.Any]]:
+    if rows:
+        return list(zip(*rows, strict=True))
+    return [()] * len(cols)
+
+
+def _numpy_dtype(type_: t.Optional[ColTypesDefinition]) -> t.Optional[str]:
+    if isinstance(type_, int):
+        return NUMPY_DTYPES.get(DataType(type_))
+    return None
+
+
+def rows_to_numpy(
+    cols: t.Sequence[str],
+    col_types: t.Optional[t.Sequence[ColTypesDefinition]],
+    rows: t.Sequence[t.Sequence[t.Any]],
+    converter: t.Optional[Converter] = None,
+) -> t.Dict[str, t.Any]:
+    """
+    Convert result rows to a dictionary of NumPy arrays, one per column.
+
+    Columns of numeric, boolean and timestamp types are converted to typed
+    arrays at once. ``TIMESTAMP`` and ``DATE`` columns become arrays of
+    ``datetime64[ms]`` in UTC. Columns of these types containing ``NULL``
+    values become masked arrays, masking the ``NULL`` values.
+
+    Columns of other types become arrays of Python objects, converted using
+    the `converter`, if given.
+    """
+    np = _import("numpy", "fetchnumpy()", "NumPy", "numpy")
+    types: t.Sequence[t.Optional[ColTypesDefinition]]
+    types = col_types or [None] * len(cols)
+
+    result = {}
+    for name, type_, values in zip(
+        cols, types, _transpose(cols, rows), strict=True
+    ):
+        dtype = _numpy_dtype(type_)
+        if dtype is None:
+            if converter is not None and type_ is not None:
+                convert = converter.get(type_)
+                convert_column = getattr(convert, "convert_column", None)
+                if convert_column is not None:
+                    values = convert_column(values)
+                else:
+                    values = [convert(value) for value in values]
+            # Assign the values, so that arrays remain elements of the
+            # result, instead of adding a dimension.
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            result[name] = column
+        elif None in values:
+            column = np.array(values, dtype=object)
+            mask = np.equal(column, None)
+            column[mask] = 0
+            result[name] = np.ma.MaskedArray(
+                _typed_array(np, column, dtype), mask=mask
+            )
+        else:
+            result[name] = _typed_array(np, values, dtype)
+    return result
+
+
+def _typed_array(np, values, dtype: str):
+    if dtype.startswith("datetime64"):
+        # Timestamps are transferred as milliseconds since epoch.
+        return np.asarray(values, dtype="int64").view(dtype)
+    return np.asarray(values, dtype=dtype)
+
+
+def _arrow_type(pa, type_: t.Optional[ColTypesDefinition]):
+    if type_ is None:
+        return None
+    if not isinstance(type_, int):
+        _, inner_type = type_
+        inner = _arrow_type(pa, inner_type)
+        return None if inner is None else pa.list_(inner)
+    data_type = DataType(type_)
+    if data_type is DataType.TIMESTAMP_WITH_TZ:
+        return pa.timestamp("ms", tz="UTC")
+    if data_type is DataType.TIMESTAMP_WITHOUT_TZ:
+        return pa.timestamp("ms")
+    factory = ARROW_TYPES.get(data_type)
+    return None if factory is None else getattr(pa, factory)()
+
+
+def rows_to_arrow(
+    cols: t.Sequence[str],
+    col_types: t.Optional[t.Sequence[ColTypesDefinition]],
+    rows: t.Sequence[t.Sequence[t.Any]],
+    feature: str = "fetch_arrow()",
+):
+    """
+    Convert result rows to an Arrow table, building it column by column.
+
+    The Arrow type of each column is derived from its data type, including
+    ``ARRAY`` types, which become list types. ``TIMESTAMP WITH TIME ZONE``
+    columns become timestamps in UTC, ``DATE`` columns become ``date64``
+    and ``IP`` columns become strings. The types of columns of other types,
+    e.g. ``OBJECT``, are inferred from their values.
+    """
+    pa = _import("pyarrow", feature, "PyArrow", "arrow")
+    types: t.Sequence[t.Optional[ColTypesDefinition]]
+    types = col_types or [None] * len(cols)
+    arrays = [
+        pa.array(values, type=_arrow_type(pa, type_))
+        for type_, values in zip(types, _transpose(cols, rows), strict=True)
+    ]
+    return pa.Table.from_arrays(arrays, names=list(cols))
+
+
+def rows_to_pandas(
+    cols: t.Sequence[str],
+    col_types: t.Optional[t.Sequence[ColTypesDefinition]],
+    rows: t.Sequence[t.Sequence[t.Any]],
+):
+    """
+    Convert result rows to a pandas data frame, by way of an Arrow table,
+    see `rows_to_arrow`.
+    """
+    _import("pandas", "fetch_df()", "pandas", "pandas")
+    table = rows_to_arrow(cols, col_types, rows, feature="fetch_df()")
+    return table.to_pandas()
+
+
+def column_items(columns) -> t.Tuple[t.Optional[t.List[str]], t.List[t.Any]]:
+    """
+    Split columns, given as a mapping, a pandas data frame, an Arrow table
+    or a sequence, into their names, if any, and their values.
+    """
+    if hasattr(columns, "column_names") and hasattr(columns, "columns"):
+        # Arrow tables and record batches.
+        return list(columns.column_names), list(columns.columns)
+    if hasattr(columns, "items"):
+        # Mappings and pandas data frames.
+        items = list(columns.items())
+        return [name for name, _ in items], [values for _, values in items]
+    return None, list(columns)
+
+
+def _column_to_numpy(np, values):
+    if hasattr(values, "null_count") and hasattr(values, "to_pylist"):
+        # Arrow arrays. Integer columns with nulls would become floats.
+        pa_types = _import("pyarrow", "Arrow columns", "PyArrow", "arrow").types
+        if values.null_count and not (
+            pa_types.is_floating(values.type)
+            or pa_types.is_temporal(values.type)
+        ):
+            return np.array(values.to_pylist(), dtype=object)
+        return values.to_numpy(zero_copy_only=False)
+    if hasattr(values, "hasnans") and hasattr(values, "to_numpy"):
+        # pandas series.
+        if getattr(values.dtype, "tz", None) is not None:
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        elif values.hasnans and values.dtype.kind not in "fM":
+            return values.to_numpy(dtype=object, na_value=None)
+        return values.to_numpy()
+    if isinstance(values, np.ndarray):
+        return values
+    try:
+        column = np.asarray(values)
+    except ValueError:
+        column = None
+    if column is None or column.ndim != 1:
+        # Sequences of arrays, assigned to remain elements of the column.
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+    return column
+
+
+def _epoch_millis(np, column):
+    nat = np.isnat(column)
+    millis = column.astype("datetime64[ms]").view("int64")
+    if nat.any():
+        millis = millis.astype(object)
+        millis[nat] = None
+    return millis
+
+
+def columns_to_bulk_args(columns: t.Sequence[t.Any]):
+    """
+    Convert columns, given as NumPy arrays, pandas series, Arrow arrays or
+    sequences, to bulk arguments.
+
+    Timestamp columns are converted to milliseconds since epoch at once.
+    When all columns are of the same kind of numbers, or all are booleans,
+    they are stacked into one two-dimensional array, which `orjson`
+    serializes without creating Python objects per row or value. Otherwise,
+    e.g. for text columns, or integer next to float columns, which are not
+    stacked so that integers do not turn into floats, rows of Python objects
+    are built from the values of the columns, `BULK_ARGS_CHUNK_SIZE` rows at
+    a time, so that only one chunk of each column is held as Python lists.
+    """
+    np = _import("numpy", "executemany_columns()", "NumPy", "numpy")
+    arrays = []
+    for values in columns:
+        column = _column_to_numpy(np, values)
+        if column.ndim != 1:
+            raise ProgrammingError(
+                f"Columns must be one-dimensional, got {column.ndim} dimensions"
+            )
+        if column.dtype.kind == "M":
+            column = _epoch_millis(np, column)
+        arrays.append(column)
+    if len({len(column) for column in arrays}) > 1:
+        raise ProgrammingError("All columns must have the same length")
+    if not arrays:
+        return []
+
+    kinds = {column.dtype.kind for column in arrays}
+    if len(kinds) == 1:
+        (kind,) = kinds
+        dtype = np.result_type(*arrays)
+        if dtype.name in STACKABLE_DTYPES.get(kind, ()):
+            return np.column_stack(arrays).astype(dtype, copy=False)
+    rows: t.List[t.Tuple[t.Any, ...]] = []
+    for start in range(0, len(arrays[0]), BULK_ARGS_CHUNK_SIZE):
+        end = start + BULK_ARGS_CHUNK_SIZE
+        rows.extend(
+            zip(
+                *(_to_list(np, column[start:end]) for column in arrays),
+                strict=True,
+            )
+        )
+    return rows
+
+
+def _to_list(np, column) -> t.List[t.Any]:
+    if column.dtype.kind == "f":
+        nan = np.isnan(column)
+        if nan.any():
+            column = column.astype(object)
+            column[nan] = None
+    return column.tolist()
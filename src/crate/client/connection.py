@@ -19,12 +19,15 @@
 # with Crate these terms will supersede the license and you may use the
 # software solely pursuant to the terms of the relevant commercial agreement.
 
+import threading
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Union
 
 from verlib2 import Version
 
 from .blob import BlobContainer
-from .cursor import Cursor
+from .cursor import CURSOR_SQL_OPTIONS, Cursor
 from .exceptions import ConnectionError, ProgrammingError
 from .http import Client
 
@@ -54,17 +57,33 @@ class Connection:
         time_zone=None,
         jwt_token=None,
         compress: Union[int, bool] = 8192,
+        coalesce_reads=False,
+        insert_batch_window=None,
+        lanes=None,
+        adaptive_concurrency=False,
+        concurrency_wait_timeout=None,
+        node_metrics_interval=None,
+        retry_budget=None,
+        max_workers=None,
+        json_backend=None,
+        reuse_response_buffers=False,
     ):
         """
         :param servers:
             either a string in the form of '<hostname>:<port>/<path>'
             or a list of servers in the form of ['<hostname>:<port>/<path>', '...']
+            or a dictionary of locality tiers mapped to such servers, in order
+            of preference, e.g. ``{"local": [...], "zone": [...], "remote": [...]}``.
+            Servers of farther tiers are only used when all servers of nearer
+            tiers are unavailable.
         :param timeout:
             (optional)
             define the retry timeout for unreachable servers in seconds
         :param backoff_factor:
             (optional)
-            define the retry interval for unreachable servers in seconds
+            define the retry interval for unreachable servers in seconds.
+            Also used as the base of the jittered exponential backoff
+            between retries against other servers.
         :param client:
             (optional - for testing)
             client used to communicate with crate.
@@ -140,6 +159,69 @@ class Connection:
             ``False`` disables compression entirely.
             ``True`` compresses every request regardless of size.
             An integer compresses only when the payload exceeds that many bytes.
+        :param coalesce_reads:
+            (optional, defaults to ``False``)
+            Share a single in-flight HTTP request between concurrent,
+            identical read-only statements (``SELECT``, ``WITH``, ``SHOW``,
+            ``VALUES``) with identical parameters. All callers receive the
+            same result.
+        :param insert_batch_window:
+            (optional, defaults to ``None``)
+            Time in seconds to hold parameterized single-row ``INSERT``
+            statements, in order to merge identical statements issued by
+            concurrent threads into a single bulk request. Each caller
+            still receives its own row count or error. ``None`` disables
+            batching.
+        :param lanes:
+            (optional, defaults to ``None``)
+            Named lanes of traffic, which use their own connection pools and
+            concurrency limits per server, e.g.
+            ``{"batch": {"pool_size": 2, "max_concurrency": 2, "timeout": 300}}``.
+            Each lane accepts the options ``pool_size``, ``max_concurrency``
+            and ``timeout``, defaulting to the options of the connection, and
+            no concurrency limit. Select a lane using
+            ``connection.cursor(lane="batch")``.
+        :param adaptive_concurrency:
+            (optional, defaults to ``False``)
+            Limit the number of concurrent requests per server adaptively.
+            The limit shrinks when latencies grow, or when a server responds
+            with an overload status, and grows again while it is healthy.
+        :param concurrency_wait_timeout:
+            (optional, defaults to ``None``)
+            Time in seconds to wait for a free slot when the adaptive
+            concurrency limit of a server is reached, before raising a
+            ``ConnectionError``. ``None`` waits indefinitely, ``0`` fails
+            fast.
+        :param node_metrics_interval:
+            (optional, defaults to ``None``)
+            Interval in seconds for sampling the load, heap usage and thread
+            pool queues of all nodes from ``sys.nodes`` in the background.
+            When set, servers are selected randomly, weighted away from
+            overloaded nodes, instead of round-robin. Servers are matched to
+            nodes by the node names they report.
+        :param retry_budget:
+            (optional, defaults to ``None``)
+            Ratio of retries against other servers to requests, e.g. ``0.1``
+            to permit retries for 10% of the requests, plus a small reserve
+            refilled over time. Once exhausted, failing requests raise a
+            ``ConnectionError`` instead of being retried. ``None`` does not
+            limit retries. The retries spent and denied are counted in
+            ``connection.client.retry_budget``.
+        :param max_workers:
+            (optional, defaults to ``None``)
+            Maximum number of threads used to execute statements submitted
+            via ``submit()`` and ``map()``. Defaults to the default of
+            ``concurrent.futures.ThreadPoolExecutor``.
+        :param json_backend:
+            (optional, defaults to ``"orjson"``)
+            JSON backend encoding request payloads and decoding responses.
+            Either ``"orjson"``, ``"json"``, ``"msgspec"``, or an object
+            implementing ``crate.client.serialization.JSONBackend``.
+        :param reuse_response_buffers:
+            (optional, defaults to ``False``)
+            Read response bodies into a pool of reusable buffers, and decode
+            them without intermediate copies, reducing allocations on
+            services issuing many requests.
         """  # noqa: E501
 
         self._converter = converter
@@ -168,30 +250,128 @@ class Connection:
                 socket_tcp_keepcnt=socket_tcp_keepcnt,
                 jwt_token=jwt_token,
                 compress=compress,
+                coalesce_reads=coalesce_reads,
+                insert_batch_window=insert_batch_window,
+                lanes=lanes,
+                adaptive_concurrency=adaptive_concurrency,
+                concurrency_wait_timeout=concurrency_wait_timeout,
+                node_metrics_interval=node_metrics_interval,
+                retry_budget=retry_budget,
+                json_backend=json_backend,
+                reuse_response_buffers=reuse_response_buffers,
             )
+        self.max_workers = max_workers
+        self._executor: t.Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         self.lowest_server_version = self._lowest_server_version()
         self._closed = False
 
     def cursor(self, **kwargs) -> Cursor:
         """
         Return a new Cursor Object using the connection.
+
+        The ``schema``, ``username``, ``password`` and ``jwt_token`` keyword
+        arguments override those of the connection for statements executed
+        by the cursor, reusing the pooled connections of the client.
+        Overriding ``username`` or ``jwt_token`` replaces all credentials of
+        the connection.
+
+        The ``intern`` keyword argument names columns whose values are
+        interned, so that repeated values of a result share one object.
+        The ``row_factory`` keyword argument selects a factory of the rows
+        returned, see ``crate.client.rows``.
         """
         converter = kwargs.pop("converter", self._converter)
         time_zone = kwargs.pop("time_zone", self.time_zone)
+        intern = kwargs.pop("intern", None)
+        row_factory = kwargs.pop("row_factory", None)
+        options = {name: kwargs.pop(name, None) for name in CURSOR_SQL_OPTIONS}
         if not self._closed:
             return Cursor(
                 connection=self,
                 converter=converter,
                 time_zone=time_zone,
+                intern=intern,
+                row_factory=row_factory,
+                **options,
             )
         else:
             raise ProgrammingError("Connection closed")
 
+    def submit(self, sql, parameters=None, **kwargs) -> Future:
+        """
+        Execute a statement in a background thread.
+
+        Each statement is executed using its own cursor, created with the
+        given keyword arguments, sharing the connection pools of the client.
+
+        :returns: a ``concurrent.futures.Future`` resolving to the result
+            rows, exactly as returned by ``cursor.fetchall()``.
+        """
+        if self._closed:
+            raise ProgrammingError("Connection closed")
+        return self._get_executor().submit(
+            self._fetchall, sql, parameters, kwargs
+        )
+
+    def map(
+        self, sql, seq_of_parameters, max_workers=None, **kwargs
+    ) -> t.Iterator[t.List[t.Any]]:
+        """
+        Execute a statement once for every parameter sequence or mapping
+        found in ``seq_of_parameters``, concurrently.
+
+        :param max_workers:
+            (optional)
+            Maximum number of statements executed concurrently. Defaults
+            to using the threads of the connection.
+        :returns: an iterator over the result rows of each execution, in
+            the order of ``seq_of_parameters``.
+        """
+        if self._closed:
+            raise ProgrammingError("Connection closed")
+        if max_workers is None:
+            executor = self._get_executor()
+            futures = [
+                executor.submit(self._fetchall, sql, parameters, kwargs)
+                for parameters in seq_of_parameters
+            ]
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers, thread_name_prefix="crate-map"
+            )
+            try:
+                futures = [
+                    executor.submit(self._fetchall, sql, parameters, kwargs)
+                    for parameters in seq_of_parameters
+                ]
+            finally:
+                executor.shutdown(wait=False)
+        return (future.result() for future in futures)
+
+    def _fetchall(self, sql, parameters, cursor_kwargs):
+        cursor = self.cursor(**cursor_kwargs)
+        try:
+            cursor.execute(sql, parameters)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="crate"
+                )
+            return self._executor
+
     def close(self):
         """
         Close the connection now
         """
         self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
         self.client.close()
 
     def commit(self):
@@ -28,12 +28,48 @@ import datetime as dt
 import ipaddress
 from copy import deepcopy
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Union
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from zoneinfo import ZoneInfo
 
 ConverterFunction = Callable[[Optional[Any]], Optional[Any]]
 ColTypesDefinition = Union[int, List[Union[int, "ColTypesDefinition"]]]
+RowConverterFunction = Callable[[List[Any]], List[Any]]
+ColumnConverterFunction = Callable[[Sequence[Any]], List[Any]]
 
 
+def column_converter(convert_column: ColumnConverterFunction):
+    """
+    Decorate a converter function with a batch implementation, converting a
+    column of values at once.
+
+    Converters may implement ``convert_column(values) -> list`` to amortize
+    their work across all values of a column. Rows are then converted
+    column by column, see `Converter.column_converters`.
+    """
+
+    def decorate(convert: ConverterFunction) -> ConverterFunction:
+        convert.convert_column = convert_column  # type: ignore[attr-defined]
+        return convert
+
+    return decorate
+
+
+def _to_ipaddress_column(
+    values: Sequence[Optional[str]],
+) -> List[Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]]:
+    # Addresses tend to repeat within a column, convert each one once.
+    converted: Dict[Optional[str], Any] = {
+        value: ipaddress.ip_address(value)
+        for value in set(values)
+        if value is not None
+    }
+    converted[None] = None
+    return list(map(converted.__getitem__, values))
+
+
+@column_converter(_to_ipaddress_column)
 def _to_ipaddress(
     value: Optional[str],
 ) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
@@ -45,6 +81,18 @@ def _to_ipaddress(
     return ipaddress.ip_address(value)
 
 
+def _to_datetime_column(
+    values: Sequence[Optional[float]],
+) -> List[Optional[dt.datetime]]:
+    fromtimestamp = dt.datetime.fromtimestamp
+    utc = dt.timezone.utc
+    return [
+        None if value is None else fromtimestamp(value / 1e3, utc)
+        for value in values
+    ]
+
+
+@column_converter(_to_datetime_column)
 def _to_datetime(value: Optional[float]) -> Optional[dt.datetime]:
     """
     https://docs.python.org/3/library/datetime.html
@@ -54,6 +102,30 @@ def _to_datetime(value: Optional[float]) -> Optional[dt.datetime]:
     return dt.datetime.fromtimestamp(value / 1e3, tz=dt.timezone.utc)
 
 
+def _to_time_column(
+    values: Sequence[Optional[list]],
+) -> List[Optional[dt.time]]:
+    # Time zones are created once per distinct offset.
+    time_zones: Dict[Any, dt.timezone] = {}
+    result: List[Optional[dt.time]] = []
+    for value in values:
+        if value is None:
+            result.append(None)
+            continue
+        microseconds, tz_offset_seconds = value
+        tz = time_zones.get(tz_offset_seconds)
+        if tz is None:
+            tz = time_zones[tz_offset_seconds] = dt.timezone(
+                dt.timedelta(seconds=int(tz_offset_seconds))
+            )
+        seconds, microsecond = divmod(int(microseconds), 1_000_000)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        result.append(dt.time(hour, minute, second, microsecond, tzinfo=tz))
+    return result
+
+
+@column_converter(_to_time_column)
 def _to_time(value: Optional[list]) -> Optional[dt.time]:
     """
     Convert a CrateDB TIMETZ wire value to a Python ``datetime.time``.
@@ -76,6 +148,95 @@ def _to_default(value: Optional[Any]) -> Optional[Any]:
     return value
 
 
+_HOUR_MILLIS = 3_600_000
+# Maximum number of hours to cache time zone offsets for, per time zone.
+_HOUR_CACHE_SIZE = 24 * 366
+
+
+@lru_cache(maxsize=64)
+def timestamp_converter(tz: dt.tzinfo) -> ConverterFunction:
+    """
+    Return a converter function for ``TIMESTAMP`` values, returning
+    `datetime` objects in the given time zone.
+
+    Converters are created once per time zone, so that registering one for
+    the same time zone again keeps the caches of a `Converter`. For
+    ``datetime.timezone`` and ``zoneinfo.ZoneInfo`` time zones, conversion
+    is left to ``datetime.fromtimestamp``, which implements them natively.
+    For other time zones, e.g. of ``pytz``, the offset is looked up once per
+    hour, and values are computed arithmetically from the start of their
+    hour.
+    """
+    if isinstance(tz, (dt.timezone, ZoneInfo)):
+        return _native_timestamp_converter(tz)
+    return _hourly_timestamp_converter(tz)
+
+
+def _native_timestamp_converter(tz: dt.tzinfo) -> ConverterFunction:
+    fromtimestamp = dt.datetime.fromtimestamp
+
+    def convert_column(
+        values: Sequence[Optional[float]],
+    ) -> List[Optional[dt.datetime]]:
+        return [
+            None if value is None else fromtimestamp(value / 1e3, tz)
+            for value in values
+        ]
+
+    @column_converter(convert_column)
+    def convert(value: Optional[float]) -> Optional[dt.datetime]:
+        if value is None:
+            return None
+        return fromtimestamp(value / 1e3, tz)
+
+    return convert
+
+
+def _hour_start(tz: dt.tzinfo, hour: float) -> Optional[dt.datetime]:
+    """
+    Return the start of the given hour since epoch in the time zone, or
+    `None`, when its offset changes within the hour, or the local times of
+    the hour are ambiguous.
+    """
+    start = dt.datetime.fromtimestamp(hour * _HOUR_MILLIS / 1e3, tz)
+    end = dt.datetime.fromtimestamp(((hour + 1) * _HOUR_MILLIS - 1) / 1e3, tz)
+    if (
+        start.fold
+        or end.fold
+        or start.tzinfo is not end.tzinfo
+        or start.utcoffset() != end.utcoffset()
+    ):
+        return None
+    return start
+
+
+def _hourly_timestamp_converter(tz: dt.tzinfo) -> ConverterFunction:
+    fromtimestamp = dt.datetime.fromtimestamp
+    timedelta = dt.timedelta
+    hour_starts: Dict[float, Optional[dt.datetime]] = {}
+
+    def convert(value: Optional[float]) -> Optional[dt.datetime]:
+        if value is None:
+            return None
+        hour = value // _HOUR_MILLIS
+        try:
+            start = hour_starts[hour]
+        except KeyError:
+            if len(hour_starts) >= _HOUR_CACHE_SIZE:
+                hour_starts.clear()
+            start = hour_starts[hour] = _hour_start(tz, hour)
+        if start is None:
+            return fromtimestamp(value / 1e3, tz)
+        return start + timedelta(0, 0, 0, value % _HOUR_MILLIS)
+
+    def convert_column(
+        values: Sequence[Optional[float]],
+    ) -> List[Optional[dt.datetime]]:
+        return list(map(convert, values))
+
+    return column_converter(convert_column)(convert)
+
+
 # Data type identifiers defined by the CrateDB HTTP interface.
 # https://crate.io/docs/crate/reference/en/latest/interfaces/http.html#column-types
 class DataType(Enum):
@@ -111,6 +272,62 @@ class DataType(Enum):
 ConverterMapping = Dict[DataType, ConverterFunction]
 
 
+def _freeze(type_: ColTypesDefinition) -> Any:
+    """
+    Return a hashable representation of a column type definition.
+    """
+    if isinstance(type_, int):
+        return type_
+    return tuple(_freeze(item) for item in type_)
+
+
+def _compile_row_converter(
+    converters: Sequence[Optional[ConverterFunction]],
+    build: str = "list",
+) -> Callable:
+    """
+    Generate a function converting a row, calling the converter of each
+    column, and passing through the values of columns without one.
+
+    Converted rows are lists, or tuples when `build` is ``"tuple"``. When
+    `build` is ``"call"``, a function is returned instead, which binds a
+    `make_row` function, and returns a function converting rows by passing
+    a tuple of their values to `make_row`. Compiled functions are reused
+    for any `make_row` function this way, without keeping a reference to
+    it.
+
+    The converters are bound as default arguments, to access them as local
+    variables.
+    """
+    namespace: Dict[str, Any] = {}
+    items = []
+    for index, convert in enumerate(converters):
+        if convert is None:
+            items.append(f"row[{index}]")
+        else:
+            name = f"convert_{index}"
+            namespace[name] = convert
+            items.append(f"{name}(row[{index}])")
+    params = "".join(f", {name}={name}" for name in namespace)
+    if build == "list":
+        expression = f"[{', '.join(items)}]"
+    elif build == "tuple":
+        expression = f"({', '.join(items)},)"
+    else:
+        expression = f"make_row(({', '.join(items)},))"
+        source = (
+            "def bind(make_row):\n"
+            f"    def convert_row(row, make_row=make_row{params}):\n"
+            f"        return {expression}\n"
+            "    return convert_row\n"
+        )
+        exec(source, namespace)  # noqa: S102
+        return namespace["bind"]
+    source = f"def convert_row(row{params}):\n    return {expression}\n"
+    exec(source, namespace)  # noqa: S102
+    return namespace["convert_row"]
+
+
 # Map data type identifier to converter function.
 _DEFAULT_CONVERTERS: ConverterMapping = {
     DataType.IP: _to_ipaddress,
@@ -120,7 +337,95 @@ _DEFAULT_CONVERTERS: ConverterMapping = {
 }
 
 
+# Data types with values which can not be interned, because they are not
+# hashable.
+_UNHASHABLE_TYPES = {
+    DataType.OBJECT,
+    DataType.UNCHECKED_OBJECT,
+    DataType.GEOPOINT,
+    DataType.GEOSHAPE,
+    DataType.TIME,
+    DataType.OIDVECTOR,
+}
+
+
+def _convert_each(
+    convert: ConverterFunction, values: Sequence[Any]
+) -> List[Any]:
+    return list(map(convert, values))
+
+
+def _column_functions(
+    converters: Sequence[Optional[ConverterFunction]],
+) -> List[Optional[ColumnConverterFunction]]:
+    return [
+        None
+        if convert is None
+        else getattr(convert, "convert_column", None)
+        or partial(_convert_each, convert)
+        for convert in converters
+    ]
+
+
+def _array_converter(inner_convert: ConverterFunction) -> ConverterFunction:
+    """
+    Return a converter function for ``ARRAY`` values, converting their
+    elements using `inner_convert`.
+    """
+
+    def convert(value: Any) -> Optional[List[Any]]:
+        if value is None:
+            return None
+        return [inner_convert(x) for x in value]
+
+    inner_convert_column = getattr(inner_convert, "convert_column", None)
+    if inner_convert_column is None:
+        return convert
+
+    def convert_column(values: Sequence[Any]) -> List[Any]:
+        # Convert the elements of all arrays of the column at once.
+        converted = iter(
+            inner_convert_column(
+                [x for value in values if value is not None for x in value]
+            )
+        )
+        return [
+            None if value is None else list(islice(converted, len(value)))
+            for value in values
+        ]
+
+    return column_converter(convert_column)(convert)
+
+
+def convert_columns(
+    column_converters: Sequence[Optional[ColumnConverterFunction]],
+    rows: Sequence[Sequence[Any]],
+    make_row: Optional[Callable[[Sequence[Any]], Any]] = None,
+) -> List[Any]:
+    """
+    Convert rows column by column, using the functions returned by
+    `Converter.column_converters`, and return the converted rows.
+
+    Converted rows are lists, or created by `make_row` from tuples of their
+    values.
+    """
+    if not rows:
+        return []
+    columns: List[Sequence[Any]] = list(zip(*rows, strict=False))
+    for index, convert_column in enumerate(column_converters[: len(columns)]):
+        if convert_column is not None:
+            columns[index] = convert_column(columns[index])
+    converted = zip(*columns, strict=True)
+    if make_row is tuple:
+        return list(converted)
+    return list(map(make_row or list, converted))
+
+
 class Converter:
+    # Maximum number of cached row and column converters, one per signature
+    # of column types.
+    row_converter_cache_size = 256
+
     def __init__(
         self,
         mappings: Optional[ConverterMapping] = None,
@@ -128,8 +433,32 @@ class Converter:
     ) -> None:
         self._mappings = mappings or {}
         self._default = default
+        # Resolved converters, by hashable column type definition.
+        self._converters: Dict[Any, ConverterFunction] = {}
+        # Compiled row converters, or functions binding them to a function
+        # creating rows, see `_compile_row_converter`.
+        self._row_converters: Dict[Any, Optional[Callable]] = {}
+        self._column_converters: Dict[
+            Any, Optional[List[Optional[ColumnConverterFunction]]]
+        ] = {}
 
     def get(self, type_: ColTypesDefinition) -> ConverterFunction:
+        """
+        Return the converter function for a column type definition.
+
+        Converters are resolved once per definition, and cached until
+        converters are changed using `set`.
+        """
+        key = _freeze(type_)
+        try:
+            return self._converters[key]
+        except KeyError:
+            pass
+        convert = self._resolve(type_)
+        self._converters[key] = convert
+        return convert
+
+    def _resolve(self, type_: ColTypesDefinition) -> ConverterFunction:
         if isinstance(type_, int):
             return self._mappings.get(DataType(type_), self._default)
         type_, inner_type = type_
@@ -138,17 +467,144 @@ class Converter:
                 f"Data type {type_} is not implemented as collection type"
             )
 
-        inner_convert = self.get(inner_type)
+        return _array_converter(self.get(inner_type))
 
-        def convert(value: Any) -> Optional[List[Any]]:
-            if value is None:
-                return None
-            return [inner_convert(x) for x in value]
+    def interning(
+        self, type_: ColTypesDefinition, maxsize: int
+    ) -> ConverterFunction:
+        """
+        Return a converter function for a column type definition, which
+        interns converted values in a bounded LRU cache, so that equal values
+        share a single object. Values of ``ARRAY`` columns are interned per
+        element.
 
-        return convert
+        Each call returns a converter with its own cache.
+        """
+        if not isinstance(type_, int):
+            array_type, inner_type = type_
+            if DataType(array_type) is not DataType.ARRAY:
+                raise ValueError(
+                    f"Data type {array_type} is not implemented as "
+                    "collection type"
+                )
+            return _array_converter(self.interning(inner_type, maxsize))
+        if DataType(type_) in _UNHASHABLE_TYPES:
+            raise ValueError(
+                f"Values of data type {DataType(type_).name} can not be "
+                "interned"
+            )
+        cached = lru_cache(maxsize=maxsize, typed=True)(self.get(type_))
+        return column_converter(partial(_convert_each, cached))(cached)
 
     def set(self, type_: DataType, converter: ConverterFunction):
+        if self._mappings.get(type_) is converter:
+            return
         self._mappings[type_] = converter
+        self._converters.clear()
+        self._row_converters.clear()
+        self._column_converters.clear()
+
+    def row_converter(
+        self,
+        col_types: Sequence[ColTypesDefinition],
+        make_row: Optional[Callable[[Sequence[Any]], Any]] = None,
+    ) -> Optional[RowConverterFunction]:
+        """
+        Return a function converting result rows with the given column
+        types, or `None`, when all values are passed through as they are.
+
+        The function is compiled once per signature of column types, calling
+        only the converters of columns which need conversion, and creating
+        rows using `make_row`, if given, see `_compile_row_converter`. It is
+        cached until converters are changed using `set`. Functions given as
+        `make_row` are bound to the cached function, so that they need not
+        be the same for each result.
+        """
+        if make_row is None:
+            build = "list"
+        elif make_row is tuple:
+            build = "tuple"
+        else:
+            build = "call"
+        key: Any = tuple(_freeze(type_) for type_ in col_types)
+        if build != "list":
+            key = (key, build)
+        try:
+            compiled = self._row_converters[key]
+        except KeyError:
+            converters = self.converters_for(col_types)
+            compiled = None
+            if any(convert is not None for convert in converters):
+                compiled = _compile_row_converter(converters, build)
+            self._cache(self._row_converters, key, compiled)
+        if compiled is None or build != "call":
+            return compiled
+        return compiled(make_row)
+
+    def column_converters(
+        self,
+        col_types: Sequence[ColTypesDefinition],
+        intern: Sequence[int] = (),
+        intern_size: int = 4096,
+    ) -> Optional[List[Optional[ColumnConverterFunction]]]:
+        """
+        Return functions converting the columns of result rows with the
+        given column types at once, to use with `convert_columns`.
+
+        Returns `None`, when no converter of the column types implements
+        ``convert_column``. Columns of values which are passed through as
+        they are map to `None`, converters without ``convert_column`` are
+        applied value by value. The functions are cached until converters
+        are changed using `set`.
+
+        Values of the columns at the indexes given by `intern` are interned,
+        see `interning`, using caches of at most `intern_size` values.
+        """
+        if intern:
+            # Interning caches are not shared between results.
+            converters = self.converters_for(col_types)
+            for index in intern:
+                converters[index] = self.interning(
+                    col_types[index], intern_size
+                )
+            return _column_functions(converters)
+
+        key = tuple(_freeze(type_) for type_ in col_types)
+        try:
+            return self._column_converters[key]
+        except KeyError:
+            pass
+        converters = self.converters_for(col_types)
+        column_converters = None
+        if any(hasattr(convert, "convert_column") for convert in converters):
+            column_converters = _column_functions(converters)
+        self._cache(self._column_converters, key, column_converters)
+        return column_converters
+
+    def converters_for(
+        self, col_types: Sequence[ColTypesDefinition]
+    ) -> List[Optional[ConverterFunction]]:
+        """
+        Return the converter functions for the given column types, with
+        `None` for columns of values which are passed through as they are.
+        """
+        return [
+            None if self._passes_through(type_) else self.get(type_)
+            for type_ in col_types
+        ]
+
+    def _cache(self, cache: Dict[Any, Any], key: Any, value: Any):
+        if len(cache) >= self.row_converter_cache_size:
+            del cache[next(iter(cache))]
+        cache[key] = value
+
+    def _passes_through(self, type_: ColTypesDefinition) -> bool:
+        if isinstance(type_, int):
+            return self.get(type_) is _to_default
+        array_type, inner_type = type_
+        return DataType(array_type) is DataType.ARRAY and self._passes_through(
+            inner_type
+        )
 
 
 class DefaultTypeConverter(Converter):
@@ -21,13 +21,27 @@
 import re
 import typing as t
 import warnings
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta, timezone
 from itertools import count
 
-from .converter import Converter, DataType
+from .columnar import (
+    column_items,
+    columns_to_bulk_args,
+    rows_to_arrow,
+    rows_to_numpy,
+    rows_to_pandas,
+)
+from .converter import (
+    Converter,
+    DataType,
+    _to_datetime,
+    convert_columns,
+    timestamp_converter,
+)
 from .exceptions import ProgrammingError
 
 _NAMED_PARAM_RE = re.compile(r"%\(([^)]+)\)s")
+CURSOR_SQL_OPTIONS = ("lane", "schema", "username", "password", "jwt_token")
 
 
 def _rewrite_pyformat_sql(sql: str) -> str:
@@ -121,20 +135,68 @@ class Cursor:
 
     lastrowid = None  # currently not supported
 
+    # Maximum number of distinct values interned per column of a result.
+    intern_cache_size = 4096
+
     def __init__(self, connection, converter: Converter, **kwargs):
         self.arraysize = 1
         self.connection = connection
         self._converter = converter
         self._closed = False
         self._result: t.Dict[str, t.Any] = {}
-        self.rows = None
+        self.rows: t.Optional[t.Iterator[t.Any]] = None
+        # Iterator over the remaining rows, as received from the server.
+        self._raw_rows: t.Iterator[t.List[t.Any]] = iter(())
         self._time_zone = None
+        # Converter registered for `TIMESTAMP` types by setting a time zone.
+        self._timestamp_converter: t.Optional[t.Callable] = None
         self.time_zone = kwargs.get("time_zone")
+        # Names of columns to intern the values of.
+        self._intern = frozenset(kwargs.get("intern") or ())
+        # Factory of the rows returned, see `crate.client.rows`.
+        self._row_factory = kwargs.get("row_factory")
+        if self._intern and self._converter is None:
+            self._converter = Converter()
+        # Additional options for `Client.sql`, only passed on when set.
+        self._sql_kwargs: t.Dict[str, t.Any] = {
+            name: kwargs[name]
+            for name in CURSOR_SQL_OPTIONS
+            if kwargs.get(name) is not None
+        }
 
     def execute(self, sql, parameters=None, bulk_parameters=None):
         """
         Prepare and execute a database operation (query or command).
         """
+        sql, parameters, bulk_parameters = self._prepare(
+            sql, parameters, bulk_parameters
+        )
+        self._result = self.connection.client.sql(
+            sql, parameters, bulk_parameters, **self._sql_kwargs
+        )
+        if "rows" in self._result:
+            self._set_rows()
+
+    def execute_raw(self, sql, parameters=None, bulk_parameters=None, out=None):
+        """
+        Execute a database operation, and return the body of the response
+        as ``bytes``, without decoding or converting it.
+
+        With `out`, the body is written to a file-like object or a socket
+        instead, while it is received, and the number of bytes written is
+        returned. The cursor does not provide a result set afterwards.
+        """
+        sql, parameters, bulk_parameters = self._prepare(
+            sql, parameters, bulk_parameters
+        )
+        self._result = {}
+        self.rows = None
+        self._raw_rows = iter(())
+        return self.connection.client.sql_raw(
+            sql, parameters, bulk_parameters, out=out, **self._sql_kwargs
+        )
+
+    def _prepare(self, sql, parameters, bulk_parameters):
         if self.connection._closed:
             raise ProgrammingError("Connection closed")
 
@@ -150,15 +212,7 @@ class Cursor:
                 )
             else:
                 sql = _rewrite_pyformat_sql(sql)
-
-        self._result = self.connection.client.sql(
-            sql, parameters, bulk_parameters
-        )
-        if "rows" in self._result:
-            if self._converter is None:
-                self.rows = iter(self._result["rows"])
-            else:
-                self.rows = iter(self._convert_rows())
+        return sql, parameters, bulk_parameters
 
     def executemany(self, sql, seq_of_parameters):
         """
@@ -166,8 +220,6 @@ class Cursor:
         against all parameter sequences or mappings found in the sequence
         ``seq_of_parameters``.
         """
-        row_counts = []
-        durations = []
         bulk_parameters = seq_of_parameters
         if (
             bulk_parameters
@@ -177,6 +229,39 @@ class Cursor:
             sql, bulk_parameters = _convert_named_bulk_params(
                 sql, bulk_parameters
             )
+        return self._execute_bulk(sql, bulk_parameters)
+
+    def executemany_columns(self, sql, columns):
+        """
+        Execute a database operation against all rows of the given columns,
+        like ``executemany()``.
+
+        Python objects per row or value are only avoided when all columns
+        are of the same numeric kind, e.g. all integers or all floats, or
+        all booleans. Otherwise, e.g. with text columns, or integer next to
+        float columns, rows are built from the values of the columns, like
+        for ``executemany()``, see `columns_to_bulk_args`.
+
+        `columns` is a mapping of names to columns, a pandas data frame, an
+        Arrow table, or a sequence of columns. Columns are NumPy arrays,
+        pandas series, Arrow arrays, or sequences. Named placeholders in
+        `sql` refer to the names of the columns.
+        """
+        names, values = column_items(columns)
+        if _NAMED_PARAM_RE.search(sql):
+            if names is None:
+                raise ProgrammingError(
+                    "Columns must be named when SQL uses pyformat "
+                    "(%(name)s) placeholders"
+                )
+            sql, values = _convert_named_to_positional(
+                sql, dict(zip(names, values, strict=True))
+            )
+        return self._execute_bulk(sql, columns_to_bulk_args(values))
+
+    def _execute_bulk(self, sql, bulk_parameters):
+        row_counts = []
+        durations = []
         self.execute(sql, bulk_parameters=bulk_parameters)
 
         for result in self._result.get("results", []):
@@ -193,12 +278,25 @@ class Cursor:
             "col_types": self._result.get("col_types", []),
             "results": self._result.get("results"),
         }
-        if self._converter is None:
-            self.rows = iter(self._result["rows"])
-        else:
-            self.rows = iter(self._convert_rows())
+        self._set_rows()
         return self._result["results"]
 
+    def _set_rows(self):
+        self._raw_rows = iter(self._result["rows"])
+        row_factory = self._row_factory
+        make_row = None if row_factory is None else row_factory(self)
+        if make_row is not None and getattr(row_factory, "lazy", False):
+            # Lazy row factories convert values on their own.
+            self.rows = map(make_row, self._raw_rows)
+        elif self._converter is None:
+            self.rows = (
+                self._raw_rows
+                if make_row is None
+                else map(make_row, self._raw_rows)
+            )
+        else:
+            self.rows = iter(self._convert_rows(self._raw_rows, make_row))
+
     def fetchone(self):
         """
         Fetch the next row of a query result set, returning a single sequence,
@@ -254,6 +352,57 @@ class Cursor:
                 iterate = False
         return result
 
+    def fetchnumpy(self):
+        """
+        Fetch all (remaining) rows of a query result, returning them as a
+        dictionary, mapping column names to NumPy arrays.
+
+        Columns of numeric, boolean and timestamp types are converted to
+        typed arrays at once, instead of value by value. ``TIMESTAMP`` and
+        ``DATE`` columns become arrays of ``datetime64[ms]`` in UTC. Columns
+        of these types containing ``NULL`` values become masked arrays.
+        Columns of other types become arrays of Python objects.
+
+        Requires NumPy.
+        """
+        cols, col_types, rows = self._fetch_columnar()
+        return rows_to_numpy(cols, col_types, rows, self._converter)
+
+    def fetch_arrow(self):
+        """
+        Fetch all (remaining) rows of a query result, returning them as an
+        Arrow table.
+
+        The table is built column by column, using Arrow types derived from
+        the data types of the columns, including ``ARRAY`` types.
+
+        Requires PyArrow.
+        """
+        return rows_to_arrow(*self._fetch_columnar())
+
+    def fetch_df(self):
+        """
+        Fetch all (remaining) rows of a query result, returning them as a
+        pandas data frame, converted from an Arrow table.
+
+        Requires PyArrow and pandas.
+        """
+        return rows_to_pandas(*self._fetch_columnar())
+
+    def _fetch_columnar(self):
+        if self.rows is None:
+            raise ProgrammingError(
+                "No result available. "
+                + "execute() or executemany() must be called first."
+            )
+        if self._closed:
+            raise ProgrammingError("Cursor closed")
+        return (
+            self._result.get("cols", []),
+            self._result.get("col_types"),
+            list(self._raw_rows),
+        )
+
     def close(self):
         """
         Close the cursor now
@@ -325,9 +474,10 @@ class Cursor:
             return -1
         return self._result.get("duration", 0)
 
-    def _convert_rows(self):
+    def _convert_rows(self, rows, make_row=None):
         """
-        Iterate rows, apply type converters, and generate converted rows.
+        Iterate rows, apply type converters, and generate converted rows,
+        created by `make_row`, if given.
         """
         if not ("col_types" in self._result and self._result["col_types"]):
             raise ValueError(
@@ -335,18 +485,35 @@ class Cursor:
                 "without `col_types` information"
             )
 
-        # Resolve `col_types` definition to converter functions. Running
-        # the lookup redundantly on each row loop iteration would be a
-        # huge performance hog.
+        # When converters implement `convert_column`, all remaining rows are
+        # converted column by column at once. The raw rows are advanced in
+        # step, so that columnar fetches continue after the fetched rows.
         types = self._result["col_types"]
-        converters = [self._converter.get(type_) for type_ in types]
+        intern = [
+            index
+            for index, name in enumerate(self._result.get("cols", []))
+            if name in self._intern
+        ]
+        column_converters = self._converter.column_converters(
+            types, intern=intern, intern_size=self.intern_cache_size
+        )
+        if column_converters is not None:
+            remaining = list(rows)
+            self._raw_rows = raw_rows = iter(remaining)
+            converted = convert_columns(column_converters, remaining, make_row)
+            for _, row in zip(raw_rows, converted, strict=False):
+                yield row
+            return
 
-        # Process result rows with conversion.
-        for row in self._result["rows"]:
-            yield [
-                convert(value)
-                for convert, value in zip(converters, row, strict=False)
-            ]
+        # The row converter is compiled once per signature of `col_types`,
+        # calling only the converters of columns which need conversion, and
+        # creating rows in the same step. Without any, rows are passed
+        # through as they are.
+        row_converter = self._converter.row_converter(types, make_row)
+        if row_converter is None:
+            yield from (rows if make_row is None else map(make_row, rows))
+        else:
+            yield from map(row_converter, rows)
 
     @property
     def time_zone(self):
@@ -379,9 +546,22 @@ class Cursor:
         converted from UTC to use the given time zone.
         """
 
-        # Do nothing when time zone is reset.
+        # When the time zone is reset, restore the default converter for
+        # `TIMESTAMP` types, returning values in UTC, if the converter of a
+        # time zone set on this cursor is still registered. Converters
+        # shared with other cursors, or registered by the user, are left
+        # alone.
         if tz is None:
             self._time_zone = None
+            registered = self._timestamp_converter
+            self._timestamp_converter = None
+            if registered is not None and self._converter is not None:
+                for type_ in (
+                    DataType.TIMESTAMP_WITH_TZ,
+                    DataType.TIMESTAMP_WITHOUT_TZ,
+                ):
+                    if self._converter.get(type_.value) is registered:
+                        self._converter.set(type_, _to_datetime)
             return
 
         # Requesting datetime-aware `datetime` objects
@@ -397,20 +577,12 @@ class Cursor:
 
         self._time_zone = tz
 
-        def _to_datetime_with_tz(
-            value: t.Optional[float],
-        ) -> t.Optional[datetime]:
-            """
-            Convert CrateDB's `TIMESTAMP` value to a native Python `datetime`
-            object, with timezone-awareness.
-            """
-            if value is None:
-                return None
-            return datetime.fromtimestamp(value / 1e3, tz=self._time_zone)
-
-        # Register converter function for `TIMESTAMP` type.
-        self._converter.set(DataType.TIMESTAMP_WITH_TZ, _to_datetime_with_tz)
-        self._converter.set(DataType.TIMESTAMP_WITHOUT_TZ, _to_datetime_with_tz)
+        # Register converter function for `TIMESTAMP` type. Converters are
+        # created once per time zone, see `timestamp_converter`.
+        to_datetime_with_tz = timestamp_converter(tz)
+        self._converter.set(DataType.TIMESTAMP_WITH_TZ, to_datetime_with_tz)
+        self._converter.set(DataType.TIMESTAMP_WITHOUT_TZ, to_datetime_with_tz)
+        self._timestamp_converter = to_datetime_with_tz
 
     @staticmethod
     def _timezone_from_utc_offset(tz) -> timezone:
@@ -20,26 +20,28 @@
 # software solely pursuant to the terms of the relevant commercial agreement.
 
 
-import calendar
-import datetime as dt
 import gzip
 import heapq
 import io
 import logging
 import os
+import random
 import re
 import socket
 import ssl
 import threading
 import typing as t
+import weakref
+import zlib
 from base64 import b64encode
-from decimal import Decimal
-from time import time
-from urllib.parse import SplitResult, urlparse
+from collections import OrderedDict
+from contextlib import nullcontext
+from time import monotonic, sleep, time
+from urllib.parse import SplitResult, unquote, urlparse
 
 import orjson
 import urllib3
-from urllib3 import connection_from_url
+from urllib3 import HTTPConnectionPool, connection_from_url
 from urllib3.connection import HTTPConnection
 from urllib3.exceptions import (
     HTTPError,
@@ -59,14 +61,27 @@ from crate.client.exceptions import (
     IntegrityError,
     ProgrammingError,
 )
+from crate.client.serialization import (  # noqa: F401
+    JSONBackend,
+    default_json_backend,
+    get_json_backend,
+    json_dumps,
+    json_encoder,
+)
 
 logger = logging.getLogger(__name__)
 
 
-_HTTP_PAT = pat = re.compile("https?://.+", re.I)
+_HTTP_PAT = pat = re.compile(r"(https?|http\+unix)://.+", re.I)
+_UNIX_SOCKET_SCHEME = "http+unix://"
+_READ_ONLY_STMT_PAT = re.compile(r"\s*(SELECT|WITH|SHOW|VALUES)\b", re.I)
+_INSERT_STMT_PAT = re.compile(r"\s*INSERT\b", re.I)
+_RETURNING_PAT = re.compile(r"\bRETURNING\b", re.I)
 SRV_UNAVAILABLE_STATUSES = {502, 503, 504, 509}
 PRESERVE_ACTIVE_SERVER_EXCEPTIONS = {ConnectionResetError, BrokenPipeError}
 SSL_ONLY_ARGS = {"ca_certs", "cert_reqs", "cert_file", "key_file"}
+LANE_OPTIONS = {"pool_size", "max_concurrency", "timeout"}
+_UNLIMITED = nullcontext()
 
 
 def super_len(o):
@@ -87,60 +102,685 @@ def super_len(o):
     return None
 
 
-epoch_aware = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
-epoch_naive = dt.datetime(1970, 1, 1)
+class _InFlightCall:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: t.Optional[BaseException] = None
+
 
+class _SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into a single call.
 
-def json_encoder(obj: t.Any) -> t.Union[int, str]:
+    The first caller for a key executes the function, while all callers
+    arriving before it completes wait for and share its outcome.
     """
-    Encoder function for orjson, with additional type support.
 
-    - Python's `Decimal` type will be serialized to `str`.
-    - Python's `dt.datetime` and `dt.date` types will be
-      serialized to `int` after converting to milliseconds
-      since epoch.
-    - Python's `dt.time` will be serialized to `str`, following
-    the ISO format.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: t.Dict[t.Hashable, _InFlightCall] = {}
+
+    def do(self, key: t.Hashable, fn: t.Callable[[], t.Any]) -> t.Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _InFlightCall()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class _InsertBatch:
+    __slots__ = ("args", "full", "done", "content", "error")
+
+    def __init__(self):
+        self.args: t.List[t.Any] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.content: t.Optional[t.Dict[str, t.Any]] = None
+        self.error: t.Optional[BaseException] = None
+
 
-    https://github.com/ijl/orjson#default
-    https://cratedb.com/docs/crate/reference/en/latest/general/ddl/data-types.html#type-timestamp
+class _InsertBatcher:
     """
-    if isinstance(obj, Decimal):
-        return str(obj)
-    if isinstance(obj, dt.datetime):
-        if obj.tzinfo is not None:
-            delta = obj - epoch_aware
+    Merge identical single-row INSERT statements issued by concurrent
+    threads into a single bulk request.
+
+    The first caller for a statement waits up to `window` seconds, or until
+    `max_size` rows have been collected, and sends the bulk request. Each
+    caller receives the outcome of its own row from the ``results`` array.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        max_size: int,
+        send: t.Callable[..., t.Dict[str, t.Any]],
+    ):
+        self.window = window
+        self.max_size = max_size
+        self._send = send
+        self._lock = threading.Lock()
+        self._pending: t.Dict[t.Hashable, _InsertBatch] = {}
+
+    def submit(self, key: t.Hashable, stmt: str, args: t.Any, **kwargs):
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = self._pending[key] = _InsertBatch()
+                leader = True
+            else:
+                leader = False
+            index = len(batch.args)
+            batch.args.append(args)
+            if len(batch.args) >= self.max_size:
+                del self._pending[key]
+                batch.full.set()
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+            try:
+                batch.content = self._send(stmt, batch.args, **kwargs)
+            except BaseException as ex:
+                batch.error = ex
+            finally:
+                batch.done.set()
         else:
-            delta = obj - epoch_naive
-        return int(
-            delta.microseconds / 1000.0
-            + (delta.seconds + delta.days * 24 * 3600) * 1000.0
+            batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        return _bulk_row_result(batch.content, index)
+
+
+def _bulk_row_result(content, index):
+    """
+    Extract the outcome of a single row from a bulk response, and shape it
+    like the response of a regular single-row statement.
+    """
+    result = content["results"][index]
+    error_message = result.get("error_message")
+    if error_message or result.get("rowcount") == -2:
+        error_message = error_message or "Bulk operation failed"
+        if "DuplicateKeyException" in error_message:
+            raise IntegrityError(error_message)
+        raise ProgrammingError(error_message)
+    return {
+        "cols": content.get("cols", []),
+        "col_types": content.get("col_types", []),
+        "rows": [],
+        "rowcount": result.get("rowcount", -1),
+        "duration": content.get("duration", -1),
+    }
+
+
+class _Auth(t.NamedTuple):
+    """
+    Schema and credentials of a request, overriding those of the client.
+    """
+
+    schema: t.Optional[str]
+    username: t.Optional[str]
+    password: t.Optional[str]
+    jwt_token: t.Optional[str]
+
+
+class _Lane:
+    """
+    A named lane of traffic, with its own connection pools and concurrency
+    limit per server.
+    """
+
+    def __init__(self, name, pool_kw, max_concurrency=None):
+        self.name = name
+        self.pool_kw = pool_kw
+        self.max_concurrency = max_concurrency
+        self.servers: t.Dict[str, Server] = {}
+        self.slots: t.Dict[str, t.ContextManager] = {}
+
+    def slot(self, server):
+        slot = self.slots.get(server)
+        if slot is None:
+            if self.max_concurrency is None:
+                slot = _UNLIMITED
+            else:
+                slot = threading.BoundedSemaphore(self.max_concurrency)
+            self.slots[server] = slot
+        return slot
+
+    def close_server(self, server):
+        self.slots.pop(server, None)
+        pool = self.servers.pop(server, None)
+        if pool is not None:
+            pool.close()
+
+    def close(self):
+        for server in list(self.servers):
+            self.close_server(server)
+
+
+def _lane_pool_kw(pool_kw, pool_size=None, timeout=None, **_):
+    kw = dict(pool_kw)
+    if pool_size is not None:
+        kw["maxsize"] = int(pool_size)
+    if timeout is not None:
+        kw["timeout"] = float(timeout) if isinstance(timeout, str) else timeout
+    return kw
+
+
+class _ConcurrencyLimitExhausted(ConnectionError):
+    """
+    Raised when no slot of the adaptive concurrency limit of a server is
+    available in time.
+    """
+
+
+class _AdaptiveLimit:
+    """
+    Adaptive concurrency limit of a single server, using additive increase
+    and multiplicative decrease (AIMD).
+
+    The limit grows by one for every full window of requests completing
+    with a short-term average latency below `tolerance` times the
+    long-term average latency. It shrinks multiplicatively when the latency
+    grows beyond that, and more aggressively on overload responses or
+    failures.
+
+    Both averages are exponentially weighted, the long-term one slowly
+    following changes of the latency, like in Netflix' Gradient2 limit.
+    Comparing against it, instead of the lowest latency ever observed,
+    keeps the limit stable for mixed workloads of fast and slow statements.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 2.0,
+        decrease: float = 0.9,
+        backoff: float = 0.5,
+        smoothing: float = 0.2,
+        long_smoothing: float = 0.01,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.decrease = decrease
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.long_smoothing = long_smoothing
+        self.in_flight = 0
+        self.samples = 0
+        self.latency: t.Optional[float] = None
+        self.long_latency: t.Optional[float] = None
+        self._cond = threading.Condition(threading.Lock())
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def acquire(self, timeout: t.Optional[float] = None) -> bool:
+        with self._cond:
+            if timeout is not None and timeout <= 0:
+                acquired = self._has_capacity()
+            else:
+                acquired = self._cond.wait_for(self._has_capacity, timeout)
+            if acquired:
+                self.in_flight += 1
+            return acquired
+
+    def release(self, latency: t.Optional[float], overloaded: bool):
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            elif latency is not None:
+                self.samples += 1
+                if self.latency is None or self.long_latency is None:
+                    self.latency = self.long_latency = latency
+                else:
+                    self.latency += self.smoothing * (latency - self.latency)
+                    # Use the plain average of the first samples, so that
+                    # the long-term average does not stick to the first.
+                    long_smoothing = max(self.long_smoothing, 1 / self.samples)
+                    self.long_latency += long_smoothing * (
+                        latency - self.long_latency
+                    )
+                if self.latency > self.long_latency * self.tolerance:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                else:
+                    self.limit = min(
+                        self.max_limit, self.limit + 1 / self.limit
+                    )
+            self._cond.notify()
+
+
+NODE_METRICS_STMT = (
+    "SELECT name, load['1'], os_info['available_processors'], "
+    "heap['used'], heap['max'], thread_pools FROM sys.nodes"
+)
+
+
+def _node_weight(
+    load: t.Optional[float],
+    processors: t.Optional[int],
+    heap_used: t.Optional[int],
+    heap_max: t.Optional[int],
+    thread_pools: t.Optional[t.List[t.Dict[str, t.Any]]],
+) -> float:
+    """
+    Compute the routing weight of a node from its metrics in `sys.nodes`.
+
+    Healthy nodes have a weight of ``1.0``. The weight decreases when the
+    load exceeds the number of processors, when the heap usage exceeds
+    75%, and with the number of queued search and write tasks.
+
+    >>> _node_weight(1.0, 4, 100, 1000, [{"name": "search", "queue": 0}])
+    1.0
+    >>> _node_weight(8.0, 4, 750, 1000, [{"name": "write", "queue": 100}])
+    0.25
+    """
+    penalty = 0.0
+    if load is not None and processors:
+        penalty += max(0.0, load / processors - 1.0)
+    if heap_used is not None and heap_max:
+        penalty += max(0.0, heap_used / heap_max - 0.75) * 4
+    for pool in thread_pools or []:
+        if pool.get("name") in ("search", "write"):
+            penalty += (pool.get("queue") or 0) / 50
+    return 1.0 / (1.0 + penalty)
+
+
+class _NodeMetricsSampler(threading.Thread):
+    """
+    Background thread periodically sampling node metrics from `sys.nodes`,
+    in order to weight the selection of servers by their load.
+
+    Servers are mapped to nodes by the node names they report, so that
+    servers are matched independently of the addresses used to reach them,
+    e.g. DNS names, or ``localhost`` instead of ``127.0.0.1``.
+
+    Node names are cached per server. A name is looked up again when it is
+    missing from `sys.nodes`, e.g. after a node restarted under a new name,
+    and all names are looked up again every `name_refresh_samples` samples.
+    """
+
+    #: Number of samples after which the node names of servers are looked
+    #: up again.
+    name_refresh_samples = 10
+
+    def __init__(self, client: "Client", interval: float):
+        super().__init__(name="crate-node-metrics", daemon=True)
+        self.interval = interval
+        self._client = weakref.ref(client)
+        self._stopped = threading.Event()
+        # Names of the nodes behind servers, and the number of samples
+        # taken since they were looked up.
+        self._node_names: t.Dict[str, str] = {}
+        self._samples = 0
+        self._unmatched = False
+
+    def run(self):
+        while not self._stopped.is_set():
+            client = self._client()
+            if client is None:
+                return
+            try:
+                client._server_weights = self.sample(client)
+            except Exception as ex:
+                logger.warning("Unable to sample node metrics: %s", ex)
+                client._server_weights = {}
+            del client
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
+
+    def sample(self, client: "Client") -> t.Dict[str, float]:
+        data = _create_sql_payload(
+            NODE_METRICS_STMT, None, None, client.json_backend
+        )
+        content = client._json_request("POST", client.path, data=data)
+        weights_by_name = {
+            name: _node_weight(*metrics)
+            for name, *metrics in content.get("rows", [])
+            if name
+        }
+        with client._lock:
+            servers = list(client.server_pool)
+        self._samples += 1
+        if self._samples > self.name_refresh_samples:
+            self._samples = 1
+            self._node_names.clear()
+        weights = {}
+        for server in servers:
+            name = self._node_name(client, server)
+            if name in weights_by_name:
+                weights[server] = weights_by_name[name]
+            else:
+                self._node_names.pop(server, None)
+        unmatched = bool(weights_by_name) and not weights
+        if unmatched and not self._unmatched:
+            logger.warning(
+                "None of the servers %s matches a node of sys.nodes %s, "
+                "servers are not weighted by node metrics",
+                servers,
+                sorted(weights_by_name),
+            )
+        self._unmatched = unmatched
+        return weights
+
+    def _node_name(self, client: "Client", server: str) -> t.Optional[str]:
+        name = self._node_names.get(server)
+        if name is None:
+            try:
+                _, name, _ = client.server_infos(server)
+            except Exception as ex:
+                logger.debug("Unable to get node name of %s: %s", server, ex)
+                return None
+            if name is not None:
+                self._node_names[server] = name
+        return name
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries against other servers to a fraction of
+    the requests issued by a client.
+
+    Every request deposits `ratio` tokens, and every retry withdraws one.
+    Additionally, `min_per_second` tokens are refilled per second, so that
+    clients issuing few requests are still able to retry. Without a `ratio`,
+    retries are unlimited, but still counted.
+    """
+
+    def __init__(
+        self,
+        ratio: t.Optional[float] = None,
+        min_per_second: float = 10.0,
+        capacity: float = 100.0,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self.retries_spent = 0
+        self.retries_denied = 0
+        self._tokens = capacity
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        if self.ratio is None:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.ratio is not None:
+                now = monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.min_per_second,
+                )
+                self._updated = now
+                if self._tokens < 1:
+                    self.retries_denied += 1
+                    return False
+                self._tokens -= 1
+            self.retries_spent += 1
+            return True
+
+    def __repr__(self):
+        return "<RetryBudget spent={0} denied={1}>".format(
+            self.retries_spent, self.retries_denied
         )
-    if isinstance(obj, dt.time):
-        return obj.isoformat()
-    if isinstance(obj, dt.date):
-        return calendar.timegm(obj.timetuple()) * 1000
-    raise TypeError
 
 
-def json_dumps(obj: t.Any) -> bytes:
+class _UnixHTTPConnection(HTTPConnection):
     """
-    Serialize to JSON format, using `orjson`, with additional type support.
+    HTTP connection over a Unix domain socket.
+    """
+
+    def __init__(self, *args, socket_path, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.socket_path = socket_path
 
-    https://github.com/ijl/orjson
+    def _new_conn(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+
+class _UnixHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _UnixHTTPConnection  # type: ignore[assignment]
+
+    def __init__(self, socket_path, **pool_kw):
+        # TCP socket options do not apply to Unix domain sockets.
+        pool_kw.pop("socket_options", None)
+        super().__init__("localhost", **pool_kw)
+        self.conn_kw["socket_path"] = socket_path
+
+
+def _connection_from_url(server, **pool_kw):
     """
-    return orjson.dumps(
-        obj,
-        default=json_encoder,
-        option=(
-            orjson.OPT_PASSTHROUGH_DATETIME
-            | orjson.OPT_NON_STR_KEYS
-            | orjson.OPT_SERIALIZE_NUMPY
-        ),
-    )
+    Create a connection pool for the given server url, supporting
+    ``http+unix://<percent-encoded socket path>`` urls for Unix domain
+    sockets in addition to the schemes supported by urllib3.
+    """
+    if server[: len(_UNIX_SOCKET_SCHEME)].lower() == _UNIX_SOCKET_SCHEME:
+        socket_path = unquote(urlparse(server).netloc)
+        return _UnixHTTPConnectionPool(socket_path, **pool_kw)
+    return connection_from_url(server, **pool_kw)
+
+
+class _ResponseBuffers:
+    """
+    Pool of reusable buffers to read response bodies into.
+
+    Bodies are read from the underlying HTTP response using ``readinto``,
+    gzip and deflate encoded bodies are decompressed chunk by chunk, and the
+    JSON backend decodes a ``memoryview`` of the buffer, without creating
+    intermediate copies of the body.
+    """
+
+    chunk_size = 64 * 1024
+
+    # Zeros to grow buffers by, without allocating temporary objects of
+    # the size of the body.
+    _zeros = memoryview(bytes(chunk_size))
+
+    def __init__(self, pool_size: int, max_buffer_size: int):
+        self.pool_size = pool_size
+        self.max_buffer_size = max_buffer_size
+        self._buffers: t.List[bytearray] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def supports(response) -> bool:
+        """
+        Whether the body of the response can be read into a buffer.
+        """
+        encoding = response.headers.get("content-encoding", "identity")
+        return encoding.lower() in ("identity", "gzip", "deflate") and hasattr(
+            getattr(response, "_fp", None), "readinto"
+        )
+
+    def decode(self, response, backend: JSONBackend) -> t.Any:
+        """
+        Read the body of the response, and decode it using the backend.
+        """
+        buffer = self._acquire()
+        try:
+            try:
+                buffer, length = self._read(response, buffer)
+            except BaseException:
+                response.close()
+                raise
+            if not length:
+                return b""
+            with memoryview(buffer) as view, view[:length] as body:
+                try:
+                    return backend.loads(body)
+                except ValueError as ex:
+                    raise _invalid_response(response, bytes(body)) from ex
+        finally:
+            response.release_conn()
+            self._release(buffer)
+
+    def _read(self, response, buffer: bytearray):
+        raw = response._fp
+        encoding = response.headers.get("content-encoding", "identity").lower()
+        if encoding == "identity":
+            length = response.headers.get("content-length")
+            if length is not None:
+                return self._read_exactly(raw.readinto, buffer, int(length))
+            return self._read_into(raw.readinto, buffer)
+
+        # Accept both gzip and zlib headers, like CrateDB sends for deflate.
+        decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        chunk = self._acquire()
+        length = 0
+        try:
+            with memoryview(chunk) as chunk_view:
+                while True:
+                    read = raw.readinto(chunk_view[: self.chunk_size])
+                    data = decompressor.decompress(chunk_view[:read])
+                    if not read:
+                        data += decompressor.flush()
+                    buffer, length = self._append(buffer, length, data)
+                    if not read:
+                        return buffer, length
+        finally:
+            self._release(chunk)
+
+    @classmethod
+    def _grow(cls, buffer: bytearray, size: int):
+        while len(buffer) < size:
+            buffer += cls._zeros[: size - len(buffer)]
+
+    @classmethod
+    def _read_exactly(cls, readinto, buffer: bytearray, size: int):
+        """
+        Read a body of known size, growing the buffer to that size at most.
+        """
+        cls._grow(buffer, size)
+        length = 0
+        with memoryview(buffer) as view:
+            while length < size:
+                read = readinto(view[length:size])
+                if not read:
+                    break
+                length += read
+        return buffer, length
+
+    @classmethod
+    def _read_into(cls, readinto, buffer: bytearray):
+        """
+        Read a body of unknown size. When the buffer is full, a small read
+        probes for the end of the body, before growing the buffer.
+        """
+        length = 0
+        probe = bytearray(64)
+        while True:
+            if length == len(buffer):
+                read = readinto(probe)
+                if not read:
+                    return buffer, length
+                buffer, length = cls._append(buffer, length, probe[:read])
+                continue
+            with memoryview(buffer) as view:
+                read = readinto(view[length:])
+            if not read:
+                return buffer, length
+            length += read
+
+    @classmethod
+    def _append(
+        cls, buffer: bytearray, length: int, data: t.Union[bytes, bytearray]
+    ):
+        end = length + len(data)
+        if end > len(buffer):
+            cls._grow(buffer, max(end, 2 * len(buffer)))
+        buffer[length:end] = data
+        return buffer, end
+
+    def _acquire(self) -> bytearray:
+        with self._lock:
+            if self._buffers:
+                return self._buffers.pop()
+        return bytearray(self.chunk_size)
+
+    def _release(self, buffer: bytearray):
+        if len(buffer) > self.max_buffer_size:
+            return
+        with self._lock:
+            if len(self._buffers) < self.pool_size:
+                self._buffers.append(buffer)
+
+
+class _LRUCache:
+    """
+    Cache shared between threads, evicting the least recently used entry
+    when holding more than `max_size` entries.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: t.OrderedDict[t.Hashable, t.Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: t.Hashable) -> t.Any:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: t.Hashable, value: t.Any):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
 
 
 class Server:
+    #: Maximum number of request templates and paths cached per server,
+    #: each. Header templates are cached per combination of credentials
+    #: and schema, so that many tenants sharing a client do not evict each
+    #: other.
+    template_cache_size = 1024
+
     def __init__(self, server, **pool_kw):
         socket_options = _get_socket_opts(
             pool_kw.pop("socket_keepalive", False),
@@ -160,7 +800,12 @@ class Server:
             )
         if parsed_url.path:
             self.path_prefix = parsed_url.path.strip("/")
-        self.pool = connection_from_url(
+        # Request templates are computed once per configuration, and never
+        # mutated afterwards, so that they can be shared between threads.
+        self._paths = _LRUCache(self.template_cache_size)
+        self._headers = _LRUCache(self.template_cache_size)
+        self._retries = _LRUCache(self.template_cache_size)
+        self.pool = _connection_from_url(
             server,
             socket_options=socket_options,
             **pool_kw,
@@ -185,16 +830,55 @@ class Server:
         Always set the Content-Length and the Content-Type header.
         """
         if self.path_prefix:
-            path = "/{path_prefix}/{path}".format(
-                path_prefix=self.path_prefix, path=path.strip("/")
-            )
-        if headers is None:
-            headers = {}
+            path = self._path(path)
+        defaults, overrides = self._header_template(
+            username, password, schema, jwt_token
+        )
+        if headers:
+            headers = {**defaults, **headers, **overrides}
+        else:
+            headers = {**defaults, **overrides}
         if "Content-Length" not in headers:
             length = super_len(data)
             if length is not None:
                 headers["Content-Length"] = str(length)
 
+        retries = self._retries.get(backoff_factor)
+        if retries is None:
+            retries = Retry(read=0, backoff_factor=backoff_factor)
+            self._retries.put(backoff_factor, retries)
+        kwargs["assert_same_host"] = False
+        kwargs["redirect"] = False
+        kwargs["retries"] = retries
+        return self.pool.urlopen(
+            method,
+            path,
+            body=data,
+            preload_content=not stream,
+            headers=headers,
+            **kwargs,
+        )
+
+    def _path(self, path):
+        prefixed = self._paths.get(path)
+        if prefixed is None:
+            prefixed = "/{path_prefix}/{path}".format(
+                path_prefix=self.path_prefix, path=path.strip("/")
+            )
+            self._paths.put(path, prefixed)
+        return prefixed
+
+    def _header_template(self, username, password, schema, jwt_token):
+        """
+        Return the headers for the given credentials and schema, as a pair
+        of defaults, which headers of the request take precedence over, and
+        overrides, which take precedence over headers of the request.
+        """
+        key = (username, password, schema, jwt_token)
+        template = self._headers.get(key)
+        if template is not None:
+            return template
+
         # Sanity checks.
         if jwt_token is not None and username is not None:
             raise ValueError(
@@ -202,53 +886,50 @@ class Server:
                 "or user credentials, but not both"
             )
 
+        defaults = {}
         # Authentication token
-        if jwt_token is not None and "Authorization" not in headers:
-            headers["Authorization"] = "Bearer %s" % jwt_token
+        if jwt_token is not None:
+            defaults["Authorization"] = "Bearer %s" % jwt_token
 
         # Authentication credentials
         if username is not None:
-            if "Authorization" not in headers and username is not None:
-                credentials = username + ":"
-                if password is not None:
-                    credentials += password
-                headers["Authorization"] = "Basic %s" % b64encode(
-                    credentials.encode("utf-8")
-                ).decode("utf-8")
+            credentials = username + ":"
+            if password is not None:
+                credentials += password
+            defaults["Authorization"] = "Basic %s" % b64encode(
+                credentials.encode("utf-8")
+            ).decode("utf-8")
             # For backwards compatibility with Crate <= 2.2
-            if "X-User" not in headers:
-                headers["X-User"] = username
+            defaults["X-User"] = username
 
+        overrides = {}
         if schema is not None:
-            headers["Default-Schema"] = schema
-        headers["Accept"] = "application/json"
-        headers["Content-Type"] = "application/json"
-        kwargs["assert_same_host"] = False
-        kwargs["redirect"] = False
-        kwargs["retries"] = Retry(read=0, backoff_factor=backoff_factor)
-        return self.pool.urlopen(
-            method,
-            path,
-            body=data,
-            preload_content=not stream,
-            headers=headers,
-            **kwargs,
-        )
+            overrides["Default-Schema"] = schema
+        overrides["Accept"] = "application/json"
+        overrides["Content-Type"] = "application/json"
+
+        template = (defaults, overrides)
+        self._headers.put(key, template)
+        return template
 
     def close(self):
         self.pool.close()
 
 
-def _json_from_response(response):
+def _json_from_response(response, backend=default_json_backend):
     try:
-        return orjson.loads(response.data)
+        return backend.loads(response.data)
     except ValueError as ex:
-        raise ProgrammingError(
-            "Invalid server response of content-type '{}':\n{}".format(
-                response.headers.get("content-type", "unknown"),
-                response.data.decode("utf-8"),
-            )
-        ) from ex
+        raise _invalid_response(response, response.data) from ex
+
+
+def _invalid_response(response, data: bytes) -> ProgrammingError:
+    return ProgrammingError(
+        "Invalid server response of content-type '{}':\n{}".format(
+            response.headers.get("content-type", "unknown"),
+            data.decode("utf-8"),
+        )
+    )
 
 
 def _blob_path(table, digest):
@@ -325,6 +1006,8 @@ def _server_url(server):
     https://a/path
     >>> print(_server_url('demo.crate.io'))
     http://demo.crate.io
+    >>> print(_server_url('http+unix://%2Frun%2Fcrate.sock'))
+    http+unix://%2Frun%2Fcrate.sock
     """
     if not _HTTP_PAT.match(server):
         server = "http://%s" % server
@@ -338,6 +1021,26 @@ def _to_server_list(servers):
     return [_server_url(s) for s in servers]
 
 
+def _to_server_tiers(
+    tiers: t.Dict[str, t.Any],
+) -> t.Tuple[t.List[str], t.Dict[str, int]]:
+    """
+    Flatten tiered server groups into a list of servers, and map each server
+    to the position of its tier, in order of preference.
+
+    >>> _to_server_tiers({"local": "a", "remote": ["b", "c"]})
+    (['http://a', 'http://b', 'http://c'], {'http://a': 0, 'http://b': 1, 'http://c': 1})
+    """  # noqa: E501
+    servers: t.List[str] = []
+    server_tiers: t.Dict[str, int] = {}
+    for tier, group in enumerate(tiers.values()):
+        for server in _to_server_list(group):
+            if server not in server_tiers:
+                servers.append(server)
+                server_tiers[server] = tier
+    return servers, server_tiers
+
+
 def _pool_kw_args(
     verify_ssl_cert,
     ca_cert,
@@ -394,18 +1097,25 @@ def _update_pool_kwargs_for_ssl_minimum_version(server, kwargs):
             kwargs["ssl_minimum_version"] = ssl.TLSVersion.MINIMUM_SUPPORTED
 
 
-def _create_sql_payload(stmt, args, bulk_args) -> bytes:
+def _is_empty(bulk_args) -> bool:
+    # Bulk arguments may be NumPy arrays, which have no truth value.
+    return bulk_args is None or len(bulk_args) == 0
+
+
+def _create_sql_payload(
+    stmt, args, bulk_args, backend: JSONBackend = default_json_backend
+) -> bytes:
     if not isinstance(stmt, str):
         raise ValueError("stmt is not a string")
-    if args and bulk_args:
+    if args and not _is_empty(bulk_args):
         raise ValueError("Cannot provide both: args and bulk_args")
 
     data = {"stmt": stmt}
     if args:
         data["args"] = args
-    if bulk_args:
+    if not _is_empty(bulk_args):
         data["bulk_args"] = bulk_args
-    return json_dumps(data)
+    return backend.dumps(data)
 
 
 def _get_socket_opts(
@@ -448,6 +1158,37 @@ class Client:
     default_server = "http://127.0.0.1:4200"
     """Default server to use if no servers are given on instantiation."""
 
+    redirect_pool_max_size = 32
+    """Maximum number of pools kept for servers discovered via redirects."""
+
+    redirect_pool_idle_timeout = 300
+    """Idle time in seconds after which a redirect server pool is closed."""
+
+    redirect_pool_check_interval = 1
+    """Minimum interval in seconds between checks for idle redirect server
+    pools on requests."""
+
+    insert_batch_max_size = 1000
+    """Maximum number of rows merged into a single batched INSERT request."""
+
+    concurrency_limit_initial = 16
+    """Initial adaptive concurrency limit per server."""
+
+    concurrency_limit_min = 1
+    """Lower bound of the adaptive concurrency limit per server."""
+
+    concurrency_limit_max = 256
+    """Upper bound of the adaptive concurrency limit per server."""
+
+    retry_backoff_max = 10
+    """Upper bound in seconds of the backoff between retries."""
+
+    response_buffer_pool_size = 16
+    """Maximum number of reusable response buffers kept by the client."""
+
+    response_buffer_max_size = 16 * 1024 * 1024
+    """Size in bytes above which response buffers are not reused."""
+
     def __init__(
         self,
         servers=None,
@@ -469,9 +1210,22 @@ class Client:
         socket_tcp_keepcnt=None,
         jwt_token=None,
         compress: t.Union[int, bool] = 8192,
+        coalesce_reads=False,
+        insert_batch_window=None,
+        lanes=None,
+        adaptive_concurrency=False,
+        concurrency_wait_timeout=None,
+        node_metrics_interval=None,
+        retry_budget=None,
+        json_backend=None,
+        reuse_response_buffers=False,
     ):
+        # Preference of servers by locality tier, lower is nearer.
+        self._server_tiers: t.Dict[str, int] = {}
         if not servers:
             servers = [self.default_server]
+        elif isinstance(servers, dict):
+            servers, self._server_tiers = _to_server_tiers(servers)
         else:
             servers = _to_server_list(servers)
 
@@ -512,9 +1266,34 @@ class Client:
         )
         self.ssl_relax_minimum_version = ssl_relax_minimum_version
         self.backoff_factor = backoff_factor
+        self.retry_budget = RetryBudget(retry_budget)
+        self.json_backend = get_json_backend(json_backend)
+        self._response_buffers = (
+            _ResponseBuffers(
+                self.response_buffer_pool_size, self.response_buffer_max_size
+            )
+            if reuse_response_buffers
+            else None
+        )
         self.server_pool: t.Dict[str, Server] = {}
+        # Servers added by following redirects, in least recently used
+        # order, mapped to the time they were last used.
+        self._redirect_servers: t.OrderedDict[str, float] = OrderedDict()
+        self._redirect_check_due = 0.0
         self._update_server_pool(servers, **pool_kw)
         self._pool_kw = pool_kw
+        self._lanes: t.Dict[str, _Lane] = {}
+        for name, options in (lanes or {}).items():
+            unknown = set(options) - LANE_OPTIONS
+            if unknown:
+                raise ValueError(
+                    f"Unknown options for lane {name!r}: {sorted(unknown)}"
+                )
+            self._lanes[name] = _Lane(
+                name,
+                _lane_pool_kw(pool_kw, **options),
+                options.get("max_concurrency"),
+            )
         self._lock = threading.RLock()
         self._local = threading.local()
         self.username = username
@@ -527,46 +1306,249 @@ class Client:
                 f"compress must be bool or int, got {type(compress).__name__!r}"
             )
         self.compress = compress
+        self._single_flight = _SingleFlight() if coalesce_reads else None
+        self.adaptive_concurrency = adaptive_concurrency
+        self.concurrency_wait_timeout = concurrency_wait_timeout
+        self._concurrency_limits: t.Dict[str, _AdaptiveLimit] = {}
+        self._insert_batcher = None
+        if insert_batch_window is not None:
+            self._insert_batcher = _InsertBatcher(
+                float(insert_batch_window),
+                self.insert_batch_max_size,
+                self._send_insert_batch,
+            )
 
         self.path = self.SQL_PATH
         if error_trace:
             self.path += "&error_trace=true"
 
+        # Routing weights of servers, derived from node metrics.
+        self._server_weights: t.Dict[str, float] = {}
+        self._node_metrics_sampler = None
+        if node_metrics_interval is not None:
+            self._node_metrics_sampler = _NodeMetricsSampler(
+                self, float(node_metrics_interval)
+            )
+            self._node_metrics_sampler.start()
+
     def close(self):
+        if self._node_metrics_sampler is not None:
+            self._node_metrics_sampler.stop()
         for server in self.server_pool.values():
             server.close()
+        for lane in self._lanes.values():
+            lane.close()
 
-    def _create_server(self, server, **pool_kw):
+    def _new_server(self, server, **pool_kw):
         kwargs = _remove_certs_for_non_https(server, pool_kw)
         # After updating to urllib3 v2, optionally retain support
         # for TLS 1.0 and TLS 1.1, in order to support connectivity
         # to older versions of CrateDB.
         if self.ssl_relax_minimum_version:
             _update_pool_kwargs_for_ssl_minimum_version(server, kwargs)
-        self.server_pool[server] = Server(server, **kwargs)
+        return Server(server, **kwargs)
+
+    def _create_server(self, server, **pool_kw):
+        self.server_pool[server] = self._new_server(server, **pool_kw)
+
+    def _server_for(self, server, lane=None):
+        """
+        Return the server pool and the concurrency slot to use for a request
+        to the given server within the given lane.
+        """
+        if lane is None:
+            return self.server_pool[server], _UNLIMITED
+        lane_ = self._lanes[lane]
+        with self._lock:
+            pool = lane_.servers.get(server)
+            if pool is None:
+                if server not in self.server_pool:
+                    raise KeyError(server)
+                pool = self._new_server(server, **lane_.pool_kw)
+                lane_.servers[server] = pool
+            return pool, lane_.slot(server)
 
     def _update_server_pool(self, servers, **pool_kw):
         for server in servers:
             self._create_server(server, **pool_kw)
 
-    def sql(self, stmt, parameters=None, bulk_parameters=None):
+    def sql(
+        self,
+        stmt,
+        parameters=None,
+        bulk_parameters=None,
+        lane=None,
+        schema=None,
+        username=None,
+        password=None,
+        jwt_token=None,
+    ):
         """
         Execute SQL stmt against the crate server.
+
+        Requests of a named `lane` use the pools and concurrency limits
+        configured for that lane.
+
+        The `schema` and credentials override those of the client for this
+        request only, using the same pooled connections.
         """
         if stmt is None:
             return None
+        if lane is not None and lane not in self._lanes:
+            raise ProgrammingError(f"Unknown lane: {lane!r}")
+        auth = self._auth_for(schema, username, password, jwt_token)
+
+        if (
+            self._insert_batcher is not None
+            and parameters
+            and _is_empty(bulk_parameters)
+            and isinstance(parameters, (list, tuple))
+            and _INSERT_STMT_PAT.match(stmt)
+            and not _RETURNING_PAT.search(stmt)
+        ):
+            return self._insert_batcher.submit(
+                (stmt, auth or self.schema, lane),
+                stmt,
+                parameters,
+                lane=lane,
+                auth=auth,
+            )
 
-        data = _create_sql_payload(stmt, parameters, bulk_parameters)
+        data = _create_sql_payload(
+            stmt, parameters, bulk_parameters, self.json_backend
+        )
         logger.debug("Sending request to %s with payload: %s", self.path, data)
-        content = self._json_request("POST", self.path, data=data)
+        if (
+            self._single_flight is not None
+            and _is_empty(bulk_parameters)
+            and _READ_ONLY_STMT_PAT.match(stmt)
+        ):
+            content = self._single_flight.do(
+                (data, auth or self.schema, lane),
+                lambda: self._json_request(
+                    "POST", self.path, data=data, lane=lane, auth=auth
+                ),
+            )
+            # Callers share the parsed rows, but get their own result dict.
+            if isinstance(content, dict):
+                content = dict(content)
+        else:
+            content = self._json_request(
+                "POST", self.path, data=data, lane=lane, auth=auth
+            )
         logger.debug("JSON response for stmt(%s): %s", stmt, content)
 
         return content
 
+    def sql_raw(
+        self,
+        stmt,
+        parameters=None,
+        bulk_parameters=None,
+        out=None,
+        lane=None,
+        schema=None,
+        username=None,
+        password=None,
+        jwt_token=None,
+    ):
+        """
+        Execute SQL stmt against the crate server, and return the body of
+        the response without decoding it.
+
+        With `out`, the body is streamed into a file-like object, or a
+        socket, and the number of bytes written is returned.
+        """
+        if lane is not None and lane not in self._lanes:
+            raise ProgrammingError(f"Unknown lane: {lane!r}")
+        auth = self._auth_for(schema, username, password, jwt_token)
+        data = _create_sql_payload(
+            stmt, parameters, bulk_parameters, self.json_backend
+        )
+        response = self._sql_request(
+            "POST",
+            self.path,
+            data,
+            lane=lane,
+            auth=auth,
+            stream=out is not None,
+        )
+        if not 200 <= response.status < 300:
+            _raise_for_status(response)
+        content_type = response.headers.get("content-type", "unknown")
+        if not content_type.startswith("application/json"):
+            if out is not None:
+                response.drain_conn()
+                response.release_conn()
+            raise ProgrammingError(
+                f"Invalid server response of content-type '{content_type}'"
+            )
+        if out is None:
+            return response.data
+
+        write = getattr(out, "write", None) or out.sendall
+        written = 0
+        try:
+            for chunk in response.stream(_ResponseBuffers.chunk_size):
+                write(chunk)
+                written += len(chunk)
+        finally:
+            response.release_conn()
+        return written
+
+    def _auth_for(
+        self, schema=None, username=None, password=None, jwt_token=None
+    ) -> t.Optional[_Auth]:
+        """
+        Resolve per-request overrides of the schema and credentials.
+
+        Overriding either `username` or `jwt_token` replaces all credentials
+        of the client, so that they never get mixed up.
+        """
+        overrides = (schema, username, password, jwt_token)
+        if all(value is None for value in overrides):
+            return None
+        if username is None and jwt_token is None:
+            username = self.username
+            jwt_token = self.jwt_token
+            if password is None:
+                password = self.password
+        if username is not None and jwt_token is not None:
+            raise ProgrammingError(
+                "Either JWT tokens are accepted, "
+                "or user credentials, but not both"
+            )
+        if schema is None:
+            schema = self.schema
+        return _Auth(schema, username, password, jwt_token)
+
+    def _send_insert_batch(self, stmt, rows, lane=None, auth=None):
+        """
+        Send rows collected by the INSERT batcher. A single row is sent as
+        a regular statement, multiple rows as one bulk request.
+        """
+        if len(rows) == 1:
+            data = _create_sql_payload(stmt, rows[0], None, self.json_backend)
+            content = self._json_request(
+                "POST", self.path, data=data, lane=lane, auth=auth
+            )
+            rowcount = content.get("rowcount", -1)
+            return {**content, "results": [{"rowcount": rowcount}]}
+        data = _create_sql_payload(stmt, None, rows, self.json_backend)
+        logger.debug("Sending batch of %d rows for stmt(%s)", len(rows), stmt)
+        return self._json_request(
+            "POST",
+            self.path,
+            data=data,
+            bulk_results=True,
+            lane=lane,
+            auth=auth,
+        )
+
     def server_infos(self, server):
         response = self._request("GET", "/", server=server)
         _raise_for_status(response)
-        content = _json_from_response(response)
+        content = _json_from_response(response, self.json_backend)
         node_name = content.get("name")
         node_version = content.get("version", {}).get("number", "0.0.0")
         return server, node_name, node_version
@@ -625,27 +1607,76 @@ class Client:
         return False
 
     def _add_server(self, server):
+        """
+        Add a server discovered via a redirect to the server pool.
+
+        Redirect servers are kept in a bounded LRU. Pools which have been
+        idle for longer than `redirect_pool_idle_timeout`, or which exceed
+        `redirect_pool_max_size`, are closed and recreated on demand.
+        """
         with self._lock:
-            if server not in self.server_pool:
+            now = time()
+            if server in self._redirect_servers:
+                self._redirect_servers.move_to_end(server)
+            elif server not in self.server_pool:
                 self._create_server(server, **self._pool_kw)
+            else:
+                # Server is part of the configured servers.
+                return
+            self._redirect_servers[server] = now
+            self._evict_redirect_servers(now)
 
-    def _request(self, method, path, server=None, **kwargs):
+    def _evict_idle_redirect_servers(self):
+        """
+        Close idle redirect server pools also when no further redirects
+        arrive, checking at most once per `redirect_pool_check_interval`.
+        """
+        if not self._redirect_servers:
+            return
+        now = time()
+        if now < self._redirect_check_due:
+            return
+        with self._lock:
+            self._redirect_check_due = now + self.redirect_pool_check_interval
+            self._evict_redirect_servers(now, keep=0)
+
+    def _evict_redirect_servers(self, now, keep=1):
+        # By default, the most recently used server is never evicted, as it
+        # is about to be used by the caller.
+        while len(self._redirect_servers) > keep:
+            server, last_used = next(iter(self._redirect_servers.items()))
+            idle = last_used + self.redirect_pool_idle_timeout < now
+            if not idle and (
+                len(self._redirect_servers) <= self.redirect_pool_max_size
+            ):
+                break
+            del self._redirect_servers[server]
+            self.server_pool.pop(server).close()
+            for lane in self._lanes.values():
+                lane.close_server(server)
+            self._concurrency_limits.pop(server, None)
+            logger.debug("Closed pool of redirect server %s", server)
+
+    def _request(
+        self, method, path, server=None, lane=None, auth=None, **kwargs
+    ):
         """Execute a request to the cluster
 
         A server is selected from the server pool.
         """
+        if server is None:
+            self.retry_budget.deposit()
+            self._evict_idle_redirect_servers()
+        attempt = 0
+        message = None
         while True:
+            if attempt:
+                self._backoff(attempt, message)
+            attempt += 1
             next_server = server or self._get_server()
             try:
-                response = self.server_pool[next_server].request(
-                    method,
-                    path,
-                    username=self.username,
-                    password=self.password,
-                    backoff_factor=self.backoff_factor,
-                    schema=self.schema,
-                    jwt_token=self.jwt_token,
-                    **kwargs,
+                response = self._send(
+                    next_server, lane, method, path, auth, **kwargs
                 )
                 redirect_location = response.get_redirect_location()
                 if redirect_location and 300 <= response.status <= 308:
@@ -653,9 +1684,15 @@ class Client:
                     redirect_server = f"{redirect_url.scheme}://{redirect_url.netloc}"
                     self._add_server(redirect_server)
                     return self._request(
-                        method, path, server=redirect_server, **kwargs
+                        method,
+                        path,
+                        server=redirect_server,
+                        lane=lane,
+                        auth=auth,
+                        **kwargs,
                     )
                 if not server and response.status in SRV_UNAVAILABLE_STATUSES:
+                    message = response.reason
                     with self._lock:
                         # drop server from active ones
                         self._drop_server(next_server, response.reason)
@@ -673,6 +1710,7 @@ class Client:
                     raise ConnectionError(
                         "Server not available, exception: %s" % ex_message
                     ) from ex
+                message = ex_message
                 preserve_server = False
                 if isinstance(ex, ProtocolError):
                     preserve_server = any(
@@ -683,12 +1721,98 @@ class Client:
                     with self._lock:
                         # drop server from active ones
                         self._drop_server(next_server, ex_message)
+            except _ConcurrencyLimitExhausted:
+                raise
             except Exception as e:
                 raise ProgrammingError(_ex_to_message(e)) from e
 
-    def _json_request(self, method, path, data):
+    def _backoff(self, attempt, message):
         """
-        Issue request against the crate HTTP API.
+        Wait before retrying a request against another server, using full
+        jitter exponential backoff, if the retry budget permits it.
+        """
+        if not self.retry_budget.withdraw():
+            raise ConnectionError(
+                "Retry budget exhausted, exception from last server: %s"
+                % message
+            )
+        if self.backoff_factor:
+            backoff = min(
+                self.retry_backoff_max,
+                self.backoff_factor * 2 ** (attempt - 1),
+            )
+            sleep(random.uniform(0, backoff))  # noqa: S311
+
+    def _send(self, server, lane, method, path, auth=None, **kwargs):
+        """
+        Send a single request to the given server, and feed its outcome
+        into the adaptive concurrency limit of the server.
+
+        The slot of the lane is taken first, so that requests waiting for
+        their lane do not hold slots of the adaptive concurrency limit,
+        which is shared by all lanes.
+        """
+        if auth is None:
+            auth = _Auth(
+                self.schema, self.username, self.password, self.jwt_token
+            )
+        server_pool, slot = self._server_for(server, lane)
+        with slot:
+            limit = self._acquire_concurrency(server)
+            started = monotonic()
+            overloaded = True
+            try:
+                response = server_pool.request(
+                    method,
+                    path,
+                    username=auth.username,
+                    password=auth.password,
+                    backoff_factor=self.backoff_factor,
+                    schema=auth.schema,
+                    jwt_token=auth.jwt_token,
+                    **kwargs,
+                )
+                overloaded = response.status in SRV_UNAVAILABLE_STATUSES
+                return response
+            finally:
+                if limit is not None:
+                    limit.release(monotonic() - started, overloaded)
+
+    def _acquire_concurrency(self, server) -> t.Optional[_AdaptiveLimit]:
+        """
+        Acquire a slot of the adaptive concurrency limit of the given server,
+        waiting at most `concurrency_wait_timeout` seconds.
+        """
+        if not self.adaptive_concurrency:
+            return None
+        with self._lock:
+            limit = self._concurrency_limits.get(server)
+            if limit is None:
+                limit = self._concurrency_limits[server] = _AdaptiveLimit(
+                    self.concurrency_limit_initial,
+                    self.concurrency_limit_min,
+                    self.concurrency_limit_max,
+                )
+        if not limit.acquire(self.concurrency_wait_timeout):
+            raise _ConcurrencyLimitExhausted(
+                "Concurrency limit of server %s exhausted (limit: %d)"
+                % (server, int(limit.limit))
+            )
+        return limit
+
+    @property
+    def concurrency_limits(self) -> t.Dict[str, int]:
+        """get the current adaptive concurrency limits per server"""
+        with self._lock:
+            return {
+                server: int(limit.limit)
+                for server, limit in self._concurrency_limits.items()
+            }
+
+    def _sql_request(self, method, path, data, lane=None, auth=None, **kwargs):
+        """
+        Issue request against the crate HTTP API, compressing the payload
+        and accepting compressed responses.
         """
         headers = {"Accept-Encoding": "gzip, deflate"}
 
@@ -699,10 +1823,53 @@ class Client:
             data = gzip.compress(data, compresslevel=6)
             headers["Content-Encoding"] = "gzip"
 
-        response = self._request(method, path, data=data, headers=headers)
+        return self._request(
+            method,
+            path,
+            data=data,
+            headers=headers,
+            lane=lane,
+            auth=auth,
+            **kwargs,
+        )
+
+    def _json_request(
+        self, method, path, data, bulk_results=False, lane=None, auth=None
+    ):
+        """
+        Issue request against the crate HTTP API.
+
+        With `bulk_results`, a failed bulk request which reports per-row
+        ``results`` is returned instead of raised, so that the outcome of
+        each row can be inspected.
+        """
+        if self._response_buffers is None:
+            response = self._sql_request(
+                method, path, data, lane=lane, auth=auth
+            )
+        else:
+            response = self._sql_request(
+                method, path, data, lane=lane, auth=auth, stream=True
+            )
+            if 200 <= response.status < 300 and self._response_buffers.supports(
+                response
+            ):
+                return self._response_buffers.decode(
+                    response, self.json_backend
+                )
+        if (
+            bulk_results
+            and response.status == 400
+            and response.headers.get("content-type", "").startswith(
+                "application/json"
+            )
+        ):
+            content = _json_from_response(response, self.json_backend)
+            if isinstance(content, dict) and "results" in content:
+                return content
         _raise_for_status(response)
         if len(response.data) > 0:
-            return _json_from_response(response)
+            return _json_from_response(response, self.json_backend)
         return response.data
 
     def _get_server(self):
@@ -735,11 +1902,48 @@ class Client:
                 self._active_servers.append(server)
                 logger.info("Restored server %s into active pool", server)
 
+            if self._server_tiers:
+                return self._select_from_nearest_tier()
+
+            weights = self._server_weights
+            if weights:
+                return self._weighted_choice(self._active_servers, weights)
+
             server = self._active_servers[0]
             self._roundrobin()
 
             return server
 
+    def _select_from_nearest_tier(self):
+        """
+        Select a server from the nearest locality tier with active servers.
+        Farther tiers are only used when all servers of nearer tiers have
+        been dropped.
+        """
+        tiers = self._server_tiers
+        nearest = min(tiers.get(s, 0) for s in self._active_servers)
+        candidates = [
+            s for s in self._active_servers if tiers.get(s, 0) == nearest
+        ]
+        weights = self._server_weights
+        if weights:
+            return self._weighted_choice(candidates, weights)
+        server = candidates[0]
+        # Round-robin within the tier.
+        self._active_servers.remove(server)
+        self._active_servers.append(server)
+        return server
+
+    @staticmethod
+    def _weighted_choice(servers, weights):
+        """
+        Select a server randomly, weighted by the load of its node. Servers
+        without known metrics get the weight of a healthy node.
+        """
+        return random.choices(  # noqa: S311
+            servers, weights=[weights.get(s, 1.0) for s in servers]
+        )[0]
+
     @property
     def active_servers(self):
         """get the active servers for this client"""
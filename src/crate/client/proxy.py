@@ -0,0 +1,284 @@
+# -*- coding: utf-8; -*-
+#
+# Licensed to CRATE Technology GmbH ("Crate") under one or more contributor
+# license agreements.  See the NOTICE file distributed with this work for
+# additional information regarding copyright ownership.  Crate licenses
+# this file to you under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.  You may
+# obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# However, if you have executed another commercial license agreement
+# with Crate these terms will supersede the license and you may use the
+# software solely pursuant to the terms of the relevant commercial agreement.
+"""
+Local multiplexing proxy for CrateDB's HTTP API.
+
+Many worker processes on the same host can share a single, small set of
+connection pools to the cluster, by pointing them at a local proxy instead
+of the cluster itself. The proxy speaks the same ``/_sql`` and ``/_blobs``
+HTTP API, and applies the failover and load-balancing logic of the `Client`
+once per host.
+
+Start it using::
+
+    python -m crate.client.proxy --servers "node1:4200 node2:4200" \\
+        --unix-socket /run/crate/proxy.sock
+
+Workers connect to it using ``http+unix://%2Frun%2Fcrate%2Fproxy.sock``, or
+``http://127.0.0.1:4201`` when using ``--listen 127.0.0.1:4201``.
+"""
+
+import argparse
+import logging
+import os
+import socketserver
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import orjson
+
+from crate.client.exceptions import ConnectionError, ProgrammingError
+from crate.client.http import Client
+
+logger = logging.getLogger(__name__)
+
+FORWARDED_REQUEST_HEADERS = (
+    "Accept-Encoding",
+    "Authorization",
+    "Content-Encoding",
+    "Default-Schema",
+    "X-User",
+)
+FORWARDED_RESPONSE_HEADERS = (
+    "Content-Type",
+    "Content-Encoding",
+    "Content-Length",
+)
+CHUNK_SIZE = 64 * 1024
+
+
+def _is_proxied_path(path: str) -> bool:
+    return (
+        path == "/"
+        or path.startswith("/?")
+        or path.startswith("/_sql")
+        or path.startswith("/_blobs/")
+    )
+
+
+class ProxyRequestHandler(BaseHTTPRequestHandler):
+    """
+    Forward requests to the cluster, using the `Client` of the server.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "CrateProxy"
+
+    def do_GET(self):
+        self.forward()
+
+    do_POST = do_PUT = do_DELETE = do_HEAD = do_GET
+
+    def address_string(self):
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def forward(self):
+        # Requests are rejected before reading their body. The connection
+        # is closed, so that the body is not read as the next request.
+        if not _is_proxied_path(self.path):
+            self.send_error_json(
+                404, f"Unsupported path: {self.path}", close=True
+            )
+            return
+
+        if "Transfer-Encoding" in self.headers:
+            self.send_error_json(
+                411, "Request body requires Content-Length", close=True
+            )
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_error_json(400, "Invalid Content-Length", close=True)
+            return
+        data = self.rfile.read(length) if length else None
+        headers = {
+            name: self.headers[name]
+            for name in FORWARDED_REQUEST_HEADERS
+            if name in self.headers
+        }
+
+        client: Client = self.server.client  # type: ignore[attr-defined]
+        try:
+            response = client._request(
+                self.command,
+                self.path,
+                data=data,
+                headers=headers,
+                stream=True,
+                decode_content=False,
+            )
+        except ConnectionError as ex:
+            self.send_error_json(503, ex.message)
+            return
+        except ProgrammingError as ex:
+            self.send_error_json(502, ex.message)
+            return
+
+        try:
+            self.send_upstream_response(response)
+        finally:
+            response.release_conn()
+
+    def send_upstream_response(self, response):
+        self.send_response(response.status, response.reason)
+        for name in FORWARDED_RESPONSE_HEADERS:
+            value = response.headers.get(name)
+            if value is not None:
+                self.send_header(name, value)
+        chunked = "Content-Length" not in response.headers
+        if chunked and self.command != "HEAD":
+            self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        for chunk in response.stream(CHUNK_SIZE, decode_content=False):
+            if chunked:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            else:
+                self.wfile.write(chunk)
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
+
+    def send_error_json(self, status: int, message: str, close: bool = False):
+        body = orjson.dumps({"error": {"message": message, "code": status}})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if close:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class ProxyServer(socketserver.BaseServer):
+    """
+    Server forwarding requests to the cluster using its `Client`.
+    """
+
+    client: Client
+
+
+class ThreadingTCPProxyServer(ProxyServer, ThreadingHTTPServer):
+    pass
+
+
+class ThreadingUnixProxyServer(
+    ProxyServer, socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+
+def create_proxy(
+    client: Client,
+    listen: t.Optional[t.Tuple[str, int]] = None,
+    unix_socket: t.Optional[str] = None,
+) -> ProxyServer:
+    """
+    Create a proxy server forwarding requests using the given `Client`,
+    listening either on a TCP address or on a Unix socket.
+
+    Call ``serve_forever()`` on the returned server to start serving.
+    """
+    server: ProxyServer
+    if unix_socket is not None and listen is None:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = ThreadingUnixProxyServer(unix_socket, ProxyRequestHandler)
+    elif listen is not None and unix_socket is None:
+        server = ThreadingTCPProxyServer(listen, ProxyRequestHandler)
+    else:
+        raise ValueError("Either listen or unix_socket must be given")
+    server.client = client
+    return server
+
+
+def _parse_listen(value: str) -> t.Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m crate.client.proxy",
+        description="Local multiplexing proxy for CrateDB's HTTP API.",
+    )
+    parser.add_argument(
+        "--servers",
+        default=Client.default_server,
+        help="Whitespace separated list of CrateDB servers.",
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument(
+        "--listen",
+        type=_parse_listen,
+        help="TCP address to listen on, e.g. 127.0.0.1:4201.",
+    )
+    target.add_argument("--unix-socket", help="Unix socket to listen on.")
+    parser.add_argument("--pool-size", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--username", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--ca-cert", default=None)
+    parser.add_argument(
+        "--no-verify-ssl-cert", dest="verify_ssl_cert", action="store_false"
+    )
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper())
+    client = Client(
+        args.servers,
+        timeout=args.timeout,
+        pool_size=args.pool_size,
+        username=args.username,
+        password=args.password,
+        ca_cert=args.ca_cert,
+        verify_ssl_cert=args.verify_ssl_cert,
+        # Request bodies are forwarded as they are.
+        compress=False,
+    )
+    listen = args.listen
+    if listen is None and args.unix_socket is None:
+        listen = ("127.0.0.1", 4201)
+    server = create_proxy(client, listen=listen, unix_socket=args.unix_socket)
+    logger.info(
+        "Proxying %s on %s", client.active_servers, args.unix_socket or listen
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# -*- coding: utf-8; -*-
+#
+# Licensed to CRATE Technology GmbH ("Crate") under one or more contributor
+# license agreements.  See the NOTICE file distributed with this work for
+# additional information regarding copyright ownership.  Crate licenses
+# this file to you under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.  You may
+# obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# However, if you have executed another commercial license agreement
+# with Crate these terms will supersede the license and you may use the
+# software solely pursuant to the terms of the relevant commercial agreement.
+"""
+Row factories, creating the rows returned by a cursor.
+
+A row factory is called once per result with the cursor, and returns a
+function creating a row from the values of a result row. Row factories
+marked as ``lazy`` receive the values as they are received from the server,
+and convert them on their own. Others receive the converted values, and are
+applied while converting them, without creating a list per row first.
+
+The functions returned by the built-in factories, and the classes of the
+rows they create, are created once per description of the columns.
+"""
+
+import keyword
+import typing as t
+from collections import namedtuple
+from collections.abc import Sequence
+from functools import lru_cache
+
+if t.TYPE_CHECKING:
+    from crate.client.converter import ConverterFunction
+    from crate.client.cursor import Cursor
+
+_MISSING = object()
+
+# Maximum number of column descriptions to cache row classes and functions
+# for, per factory.
+_ROW_CACHE_SIZE = 256
+
+
+class _Columns:
+    """
+    Names and converter functions of the columns of a result, shared by
+    all of its rows.
+    """
+
+    __slots__ = ("converters", "index", "names")
+
+    def __init__(
+        self,
+        names: t.Sequence[str],
+        converters: t.Sequence[t.Optional["ConverterFunction"]],
+    ):
+        self.names = tuple(names)
+        # The first column wins when names are ambiguous.
+        self.index = {name: i for i, name in reversed(list(enumerate(names)))}
+        self.converters = tuple(converters)
+
+
+class LazyRow(Sequence):
+    """
+    Read-only view of a result row, converting the value of a column when
+    it is first accessed, by index or by name, e.g. ``row[0]``,
+    ``row["name"]`` or ``row.name``. Converted values are cached.
+
+    Columns named like methods of rows, e.g. ``count`` or ``index``, are
+    accessible by index or by ``row["name"]`` only.
+    """
+
+    __slots__ = ("_columns", "_raw", "_values")
+
+    def __init__(self, columns: _Columns, raw: t.List[t.Any]):
+        self._columns = columns
+        self._raw = raw
+        # Converted values, allocated when the first value is converted.
+        self._values: t.Optional[t.List[t.Any]] = None
+
+    def _get(self, index: int) -> t.Any:
+        convert = self._columns.converters[index]
+        if convert is None:
+            return self._raw[index]
+        values = self._values
+        if values is None:
+            values = self._values = [_MISSING] * len(self._raw)
+        value = values[index]
+        if value is _MISSING:
+            value = values[index] = convert(self._raw[index])
+        return value
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._get(self._columns.index[key])
+        if isinstance(key, slice):
+            return [self._get(i) for i in range(*key.indices(len(self._raw)))]
+        if key < 0:
+            key += len(self._raw)
+        if not 0 <= key < len(self._raw):
+            raise IndexError("row index out of range")
+        return self._get(key)
+
+    def __getattr__(self, name: str) -> t.Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._get(self._columns.index[name])
+        except KeyError:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no column {name!r}"
+            ) from None
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        return map(self._get, range(len(self._raw)))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (LazyRow, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def keys(self) -> t.Tuple[str, ...]:
+        """
+        Return the names of the columns.
+        """
+        return self._columns.names
+
+
+def lazy_row(cursor: "Cursor") -> t.Callable[[t.List[t.Any]], LazyRow]:
+    """
+    Row factory creating `LazyRow` views of result rows, converting values
+    only when they are accessed.
+    """
+    result = cursor._result
+    converter = cursor._converter
+    names = result.get("cols", [])
+    col_types = result.get("col_types")
+    converters: t.List[t.Optional[ConverterFunction]]
+    if converter is None or not col_types:
+        converters = [None] * len(names)
+    else:
+        converters = converter.converters_for(col_types)
+    columns = _Columns(names, converters)
+
+    def make_row(raw: t.List[t.Any]) -> LazyRow:
+        return LazyRow(columns, raw)
+
+    return make_row
+
+
+lazy_row.lazy = True  # type: ignore[attr-defined]
+
+
+def _cols(cursor: "Cursor") -> t.Tuple[str, ...]:
+    return tuple(cursor._result.get("cols", ()))
+
+
+def _field_names(cols: t.Sequence[str]) -> t.Tuple[str, ...]:
+    """
+    Return the names of the fields of records of rows with the given
+    columns. Like `namedtuple` does with ``rename=True``, names which are
+    not valid identifiers, keywords, start with an underscore, or are
+    duplicates, are replaced by ``_<index>``.
+    """
+    names: t.List[str] = []
+    for index, name in enumerate(cols):
+        if (
+            not name.isidentifier()
+            or keyword.iskeyword(name)
+            or name.startswith("_")
+            or name in names
+        ):
+            name = f"_{index}"
+        names.append(name)
+    return tuple(names)
+
+
+def tuple_row(cursor: "Cursor") -> t.Callable[[t.Sequence[t.Any]], tuple]:
+    """
+    Row factory creating tuples.
+    """
+    return tuple
+
+
+@lru_cache(maxsize=_ROW_CACHE_SIZE)
+def _dict_maker(
+    cols: t.Tuple[str, ...],
+) -> t.Callable[[t.Sequence[t.Any]], t.Dict[str, t.Any]]:
+    def make_row(values: t.Sequence[t.Any]) -> t.Dict[str, t.Any]:
+        return dict(zip(cols, values, strict=True))
+
+    return make_row
+
+
+def dict_row(
+    cursor: "Cursor",
+) -> t.Callable[[t.Sequence[t.Any]], t.Dict[str, t.Any]]:
+    """
+    Row factory creating dictionaries, mapping column names to values. The
+    last column wins when names are ambiguous.
+    """
+    return _dict_maker(_cols(cursor))
+
+
+@lru_cache(maxsize=_ROW_CACHE_SIZE)
+def _namedtuple_class(cols: t.Tuple[str, ...]) -> t.Type[tuple]:
+    return namedtuple("Row", cols, rename=True)  # type: ignore[misc]
+
+
+def namedtuple_row(cursor: "Cursor") -> t.Callable[[t.Sequence[t.Any]], tuple]:
+    """
+    Row factory creating named tuples, with a field per column. Columns
+    whose names are not valid field names are renamed, see `namedtuple`.
+    """
+    return _namedtuple_class(_cols(cursor))._make  # type: ignore[attr-defined]
+
+
+class Record:
+    """
+    Base class of the records created by `record_row`, storing the values
+    of a row in slots named like the columns.
+    """
+
+    __slots__ = ()
+
+    _fields: t.Tuple[str, ...] = ()
+
+    def __init__(self, *values: t.Any):
+        if len(values) != len(self._fields):
+            raise TypeError(
+                f"{type(self).__name__}() takes {len(self._fields)} values, "
+                f"got {len(values)}"
+            )
+        for name, value in zip(self._fields, values, strict=True):
+            setattr(self, name, value)
+
+    @classmethod
+    def _make(cls, values: t.Sequence[t.Any]) -> "Record":
+        """
+        Create a record from a sequence of values.
+        """
+        return cls(*values)
+
+    def _astuple(self) -> t.Tuple[t.Any, ...]:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def _asdict(self) -> t.Dict[str, t.Any]:
+        return dict(zip(self._fields, self._astuple(), strict=True))
+
+    def __getitem__(self, index):
+        return self._astuple()[index]
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        return iter(self._astuple())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return self._astuple() == other._astuple()
+        if isinstance(other, tuple):
+            return self._astuple() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{name}={value!r}"
+            for name, value in zip(self._fields, self._astuple(), strict=True)
+        )
+        return f"{type(self).__name__}({values})"
+
+
+@lru_cache(maxsize=_ROW_CACHE_SIZE)
+def _record_class(cols: t.Tuple[str, ...]) -> t.Type[Record]:
+    """
+    Generate a subclass of `Record` with a slot per column, and a `_make`
+    function assigning all slots at once.
+    """
+    fields = _field_names(cols)
+    record_class: t.Type[Record] = type(
+        "Row", (Record,), {"__slots__": fields, "_fields": fields}
+    )
+    namespace: t.Dict[str, t.Any] = {"new": object.__new__, "cls": record_class}
+    if fields:
+        targets = "".join(f"row.{name}, " for name in fields)
+        assign = f"    {targets}= values\n"
+    else:
+        assign = ""
+    source = (
+        "def _make(values, new=new, cls=cls):\n"
+        "    row = new(cls)\n"
+        f"{assign}"
+        "    return row\n"
+    )
+    exec(source, namespace)  # noqa: S102
+    record_class._make = staticmethod(namespace["_make"])  # type: ignore[method-assign,assignment]
+    return record_class
+
+
+def record_row(cursor: "Cursor") -> t.Callable[[t.Sequence[t.Any]], Record]:
+    """
+    Row factory creating records, instances of a class with ``__slots__``
+    named like the columns, generated per description of the columns. The
+    values are accessible as attributes, by index, and by iterating. Columns
+    whose names are not valid attribute names are renamed like by
+    `namedtuple`.
+    """
+    return _record_class(_cols(cursor))._make
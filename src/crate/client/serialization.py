@@ -0,0 +1,227 @@
+# -*- coding: utf-8; -*-
+#
+# Licensed to CRATE Technology GmbH ("Crate") under one or more contributor
+# license agreements.  See the NOTICE file distributed with this work for
+# additional information regarding copyright ownership.  Crate licenses
+# this file to you under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.  You may
+# obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# However, if you have executed another commercial license agreement
+# with Crate these terms will supersede the license and you may use the
+# software solely pursuant to the terms of the relevant commercial agreement.
+"""
+JSON backends, encoding request payloads and decoding responses.
+"""
+
+import calendar
+import datetime as dt
+import json
+import math
+import typing as t
+import uuid
+from decimal import Decimal
+
+import orjson
+
+epoch_aware = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+epoch_naive = dt.datetime(1970, 1, 1)
+
+
+def json_encoder(obj: t.Any) -> t.Union[int, str]:
+    """
+    Encoder function for orjson, with additional type support.
+
+    - Python's `Decimal` type will be serialized to `str`.
+    - Python's `dt.datetime` and `dt.date` types will be
+      serialized to `int` after converting to milliseconds
+      since epoch.
+    - Python's `dt.time` will be serialized to `str`, following
+    the ISO format.
+
+    https://github.com/ijl/orjson#default
+    https://cratedb.com/docs/crate/reference/en/latest/general/ddl/data-types.html#type-timestamp
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, dt.datetime):
+        if obj.tzinfo is not None:
+            delta = obj - epoch_aware
+        else:
+            delta = obj - epoch_naive
+        return int(
+            delta.microseconds / 1000.0
+            + (delta.seconds + delta.days * 24 * 3600) * 1000.0
+        )
+    if isinstance(obj, dt.time):
+        return obj.isoformat()
+    if isinstance(obj, dt.date):
+        return calendar.timegm(obj.timetuple()) * 1000
+    raise TypeError
+
+
+def json_dumps(obj: t.Any) -> bytes:
+    """
+    Serialize to JSON format, using `orjson`, with additional type support.
+
+    https://github.com/ijl/orjson
+    """
+    return orjson.dumps(
+        obj,
+        default=json_encoder,
+        option=(
+            orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+        ),
+    )
+
+
+class JSONBackend(t.Protocol):
+    """
+    Interface of JSON backends.
+
+    `dumps` encodes request payloads, supporting the same types as
+    `json_dumps`. `loads` decodes response bodies, given as `bytes` or any
+    other bytes-like object, into dictionaries, lists and scalars, like
+    `json.loads`. All responses are decoded by the same backend, including
+    those of requests for server information.
+    """
+
+    name: str
+
+    def dumps(self, obj: t.Any) -> bytes: ...
+
+    def loads(self, data: t.Any) -> t.Any: ...
+
+
+class OrjsonBackend:
+    """
+    The default JSON backend, using `orjson`.
+    """
+
+    name = "orjson"
+
+    def dumps(self, obj: t.Any) -> bytes:
+        return json_dumps(obj)
+
+    def loads(self, data: t.Any) -> t.Any:
+        return orjson.loads(data)
+
+
+def _finite(obj: t.Any) -> t.Any:
+    """
+    Replace ``NaN`` and infinite floats by `None`, like `orjson` encodes
+    them as ``null``, because ``json`` encodes them as invalid JSON.
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _stdlib_encoder(obj: t.Any) -> t.Any:
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if hasattr(obj, "tolist"):
+        # NumPy arrays and scalars.
+        return _finite(obj.tolist())
+    return json_encoder(obj)
+
+
+class StdlibBackend:
+    """
+    JSON backend using the `json` module of the standard library.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: t.Any) -> bytes:
+        return json.dumps(
+            _finite(obj), default=_stdlib_encoder, separators=(",", ":")
+        ).encode("utf-8")
+
+    def loads(self, data: t.Any) -> t.Any:
+        if not isinstance(data, (bytes, str)):
+            data = bytes(data)
+        return json.loads(data)
+
+
+class MsgspecBackend:
+    """
+    JSON backend decoding responses using `msgspec`.
+
+    Payloads are encoded using `json_dumps`, because `msgspec` encodes
+    dates and timestamps as strings, instead of milliseconds since epoch.
+    """
+
+    name = "msgspec"
+
+    def __init__(self):
+        try:
+            import msgspec
+        except ImportError as ex:
+            raise ImportError(
+                "The msgspec JSON backend requires the msgspec package"
+            ) from ex
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: t.Any) -> bytes:
+        return json_dumps(obj)
+
+    def loads(self, data: t.Any) -> t.Any:
+        return self._decoder.decode(data)
+
+
+JSON_BACKENDS: t.Dict[str, t.Callable[[], JSONBackend]] = {
+    "orjson": OrjsonBackend,
+    "json": StdlibBackend,
+    "msgspec": MsgspecBackend,
+}
+
+default_json_backend = OrjsonBackend()
+
+
+def get_json_backend(
+    backend: t.Union[str, JSONBackend, None] = None,
+) -> JSONBackend:
+    """
+    Resolve a JSON backend, given by name, or as an object implementing
+    `JSONBackend`.
+
+    >>> get_json_backend().name
+    'orjson'
+    >>> get_json_backend("json").name
+    'json'
+    >>> get_json_backend("yaml")
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown JSON backend: 'yaml', use one of: orjson, json, msgspec
+    """
+    if backend is None:
+        return default_json_backend
+    if isinstance(backend, str):
+        factory = JSON_BACKENDS.get(backend)
+        if factory is None:
+            raise ValueError(
+                f"Unknown JSON backend: {backend!r}, "
+                f"use one of: {', '.join(JSON_BACKENDS)}"
+            )
+        return factory()
+    if not (hasattr(backend, "dumps") and hasattr(backend, "loads")):
+        raise TypeError(
+            "JSON backends must implement dumps() and loads(), "
+            f"got {type(backend).__name__!r}"
+        )
+    return backend
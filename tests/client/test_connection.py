@@ -1,4 +1,6 @@
 import datetime
+import time
+from ipaddress import IPv4Address
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -6,6 +8,7 @@ from urllib3 import Timeout
 
 from crate.client import connect
 from crate.client.connection import Connection
+from crate.client.converter import DefaultTypeConverter
 from crate.client.exceptions import ProgrammingError
 from crate.client.http import Client
 
@@ -167,3 +170,53 @@ def test_timeout_object():
     timeout = Timeout(connect=2.42, read=0.01)
     with connect("localhost:4200", timeout=timeout) as conn:
         assert conn.client._pool_kw["timeout"] == timeout
+
+
+def test_submit(mocked_connection):
+    """
+    Verify that submitted statements resolve to the converted result rows.
+    """
+    mocked_connection.client.sql.return_value = {
+        "cols": ["name", "address"],
+        "col_types": [4, 5],
+        "rows": [["foo", "10.10.10.1"]],
+        "rowcount": 1,
+    }
+    mocked_connection._converter = DefaultTypeConverter()
+
+    future = mocked_connection.submit("SELECT ?", [1], lane="batch")
+    assert future.result(timeout=5) == [["foo", IPv4Address("10.10.10.1")]]
+    mocked_connection.client.sql.assert_called_once_with(
+        "SELECT ?", [1], None, lane="batch"
+    )
+
+
+def test_map(mocked_connection):
+    """
+    Verify that mapped statements return their results in order of the
+    given parameters.
+    """
+
+    def sql(stmt, parameters, bulk_parameters):
+        time.sleep(0.01 * (5 - parameters[0]))
+        return {"cols": ["x"], "rows": [[parameters[0]]], "rowcount": 1}
+
+    mocked_connection.client.sql.side_effect = sql
+    params = [[i] for i in range(5)]
+
+    results = mocked_connection.map("SELECT ?", params)
+    assert list(results) == [[[i]] for i in range(5)]
+
+    results = mocked_connection.map("SELECT ?", params, max_workers=2)
+    assert list(results) == [[[i]] for i in range(5)]
+
+
+def test_submit_closed_connection(mocked_connection):
+    """
+    Verify that statements can not be submitted to a closed connection.
+    """
+    mocked_connection.close()
+    with pytest.raises(ProgrammingError, match="Connection closed"):
+        mocked_connection.submit("SELECT 1")
+    with pytest.raises(ProgrammingError, match="Connection closed"):
+        mocked_connection.map("SELECT 1", [[]])
@@ -20,15 +20,23 @@
 # software solely pursuant to the terms of the relevant commercial agreement.
 
 import datetime
+import json
 import zoneinfo
-from ipaddress import IPv4Address
+from ipaddress import IPv4Address, IPv6Address
 from unittest import mock
 
 import pytest
 import pytz
 
 from crate.client import connect
-from crate.client.converter import DataType, DefaultTypeConverter
+from crate.client.converter import (
+    Converter,
+    DataType,
+    DefaultTypeConverter,
+    column_converter,
+    convert_columns,
+    timestamp_converter,
+)
 from crate.client.exceptions import ProgrammingError
 
 
@@ -153,6 +161,103 @@ def test_executemany_with_named_params(mocked_connection):
         assert bulk_args == [["Arthur", 42], ["Bill", 35]]
 
 
+def test_executemany_columns(mocked_connection):
+    """
+    Verify that executemany_columns() sends homogeneous numeric columns as
+    one two-dimensional array, with timestamps in milliseconds since epoch,
+    and builds rows from columns of mixed kinds.
+    """
+    np = pytest.importorskip("numpy")
+    response = {
+        "col_types": [],
+        "cols": [],
+        "duration": 123,
+        "results": [{"rowcount": 1}, {"rowcount": 1}],
+    }
+    with mock.patch.object(
+        mocked_connection.client, "sql", return_value=response
+    ):
+        cursor = mocked_connection.cursor()
+        results = cursor.executemany_columns(
+            "INSERT INTO t (ts, x) VALUES (%(ts)s, %(x)s)",
+            {
+                "x": np.array([1, 2], dtype="int32"),
+                "ts": np.array(
+                    ["1970-01-01T00:00:01", "2022-07-18T18:10:36.758"],
+                    dtype="datetime64[us]",
+                ),
+            },
+        )
+        sql, _params, bulk_args = mocked_connection.client.sql.call_args[0]
+        assert sql == "INSERT INTO t (ts, x) VALUES ($2, $1)"
+        assert isinstance(bulk_args, np.ndarray)
+        assert bulk_args.dtype == np.int64
+        assert bulk_args.tolist() == [[1, 1000], [2, 1658167836758]]
+        assert results == [{"rowcount": 1}, {"rowcount": 1}]
+        assert cursor.rowcount == 2
+
+        cursor.executemany_columns(
+            "INSERT INTO t (name, x, ts) VALUES (?, ?, ?)",
+            [
+                ["Arthur", None],
+                np.array([0.5, np.nan]),
+                np.array(["1970-01-01", "NaT"], dtype="datetime64[D]"),
+            ],
+        )
+        _sql, _params, bulk_args = mocked_connection.client.sql.call_args[0]
+        assert bulk_args == [("Arthur", 0.5, 0), (None, None, None)]
+
+        # Rows of columns of mixed kinds are built chunk by chunk.
+        with mock.patch("crate.client.columnar.BULK_ARGS_CHUNK_SIZE", 2):
+            cursor.executemany_columns(
+                "INSERT INTO t (x, y) VALUES (?, ?)",
+                [np.arange(5), np.arange(5) / 2],
+            )
+        _sql, _params, bulk_args = mocked_connection.client.sql.call_args[0]
+        assert bulk_args == [(i, i / 2) for i in range(5)]
+        assert all(type(x) is int for x, _ in bulk_args)
+
+
+def test_executemany_columns_from_data_frame(mocked_connection):
+    """
+    Verify that executemany_columns() accepts pandas data frames and Arrow
+    tables, converting timestamps with time zone to UTC.
+    """
+    pd = pytest.importorskip("pandas")
+    pa = pytest.importorskip("pyarrow")
+    mocked_connection.client.sql.return_value = {"results": [], "duration": 1}
+    cursor = mocked_connection.cursor()
+    df = pd.DataFrame(
+        {
+            "ts": pd.to_datetime(["2022-07-18 20:10:36.758+02:00"], utc=True),
+            "x": [1],
+        }
+    )
+    for columns in (df, pa.Table.from_pandas(df)):
+        cursor.executemany_columns(
+            "INSERT INTO t (ts, x) VALUES (%(ts)s, %(x)s)", columns
+        )
+        _sql, _params, bulk_args = mocked_connection.client.sql.call_args[0]
+        assert bulk_args.tolist() == [[1658167836758, 1]]
+
+    cursor.executemany_columns(
+        "INSERT INTO t (x) VALUES (?)",
+        pa.table({"x": pa.array([1, None], type=pa.int32())}),
+    )
+    _sql, _params, bulk_args = mocked_connection.client.sql.call_args[0]
+    assert bulk_args == [(1,), (None,)]
+
+
+def test_executemany_columns_invalid(mocked_connection):
+    pytest.importorskip("numpy")
+    cursor = mocked_connection.cursor()
+    with pytest.raises(ProgrammingError, match="Columns must be named"):
+        cursor.executemany_columns("INSERT INTO t (x) VALUES (%(x)s)", [[1]])
+    with pytest.raises(ProgrammingError, match="same length"):
+        cursor.executemany_columns("INSERT INTO t VALUES (?, ?)", [[1], []])
+    mocked_connection.client.sql.assert_not_called()
+
+
 def test_executemany_with_named_params_missing_key(mocked_connection):
     """
     Verify that executemany() raises ProgrammingError when a row is missing a
@@ -320,6 +425,52 @@ def test_execute_with_args(mocked_connection):
     mocked_connection.client.sql.assert_called_once_with(statement, 1, None)
 
 
+def test_execute_with_lane(mocked_connection):
+    """
+    Verify that the lane of a cursor is passed on to the client.
+    """
+    cursor = mocked_connection.cursor(lane="batch")
+    statement = "select * from locations where position = ?"
+    cursor.execute(statement, 1)
+    mocked_connection.client.sql.assert_called_once_with(
+        statement, 1, None, lane="batch"
+    )
+
+
+def test_execute_with_overrides(mocked_connection):
+    """
+    Verify that the schema and credentials of a cursor are passed on to
+    the client.
+    """
+    cursor = mocked_connection.cursor(schema="tenant", username="alice")
+    cursor.execute("select 1")
+    mocked_connection.client.sql.assert_called_once_with(
+        "select 1", None, None, schema="tenant", username="alice"
+    )
+
+
+def test_execute_raw(mocked_connection):
+    """
+    Verify that raw execution returns the body from the client, with named
+    parameters converted, and leaves no result set behind.
+    """
+    client = mocked_connection.client
+    client.sql_raw.return_value = b'{"rows": [[1]]}'
+    cursor = mocked_connection.cursor(lane="batch")
+    statement = "select * from locations where position = %(pos)s"
+    assert cursor.execute_raw(statement, {"pos": 1}) == b'{"rows": [[1]]}'
+    client.sql_raw.assert_called_once_with(
+        "select * from locations where position = $1",
+        [1],
+        None,
+        out=None,
+        lane="batch",
+    )
+    assert cursor.rowcount == -1
+    with pytest.raises(ProgrammingError, match="No result available"):
+        cursor.fetchone()
+
+
 def test_execute_with_bulk_args(mocked_connection):
     """
     Verify that `cursor.execute` is called with the right parameters
@@ -584,6 +735,302 @@ def test_execute_nested_array_with_converter(mocked_connection):
         ]
 
 
+def test_row_converter():
+    """
+    Verify that row converters are compiled once per signature of column
+    types, pass through values of columns without conversion, and are
+    invalidated when converters are changed.
+    """
+    converter = DefaultTypeConverter()
+    row = ["foo", "10.0.0.1", ["10.0.0.2"], [1, 2], 0]
+
+    convert_row = converter.row_converter([4, 5, [100, 5], [100, 9], 9])
+    assert convert_row is converter.row_converter([4, 5, [100, 5], [100, 9], 9])
+    converted = convert_row(row)
+    assert converted == [
+        "foo",
+        IPv4Address("10.0.0.1"),
+        [IPv4Address("10.0.0.2")],
+        [1, 2],
+        0,
+    ]
+    # Values of columns without conversion are passed through as they are.
+    assert converted[3] is row[3]
+
+    # Without any conversion, rows are not converted at all.
+    assert converter.row_converter([4, [100, 9], 9]) is None
+
+    converter.set(DataType.INTEGER, str)
+    assert converter.row_converter([4, [100, 9], 9])(row[2:]) == [
+        ["10.0.0.2"],
+        ["1", "2"],
+        "0",
+    ]
+
+
+def test_converter_get_cached():
+    """
+    Verify that converters are resolved once per column type definition,
+    and that the cache is only invalidated when converters change.
+    """
+    converter = DefaultTypeConverter()
+    convert_array = converter.get([100, [100, 5]])
+    assert converter.get([100, [100, 5]]) is convert_array
+    convert_row = converter.row_converter([[100, [100, 5]]])
+
+    # Registering the same converter again keeps the caches.
+    converter.set(DataType.IP, converter.get(5))
+    assert converter.get([100, [100, 5]]) is convert_array
+    assert converter.row_converter([[100, [100, 5]]]) is convert_row
+
+    converter.set(DataType.IP, str)
+    assert converter.get([100, [100, 5]]) is not convert_array
+    assert converter.get([100, [100, 5]])([["10.0.0.1"]]) == [["10.0.0.1"]]
+
+    with pytest.raises(ValueError, match="999 is not a valid DataType"):
+        converter.get(999)
+
+
+def test_column_converters():
+    """
+    Verify that the batch implementations of the built-in converters return
+    the same values as converting value by value, including within arrays.
+    """
+    converter = DefaultTypeConverter()
+    columns = {
+        5: ["10.0.0.1", None, "10.0.0.1", "::1"],
+        11: [1658167836758, None, 0, -1000],
+        20: [[0, 0], None, [66_743_000_000, 7200], [86_399_999_999, -3600]],
+        (100, 5): [["10.0.0.1", "10.0.0.2"], None, [], ["10.0.0.1"]],
+        (100, (100, 20)): [[[[1, 0]], None], None, [[]], [[[2, 3600]]]],
+    }
+    for type_, values in columns.items():
+        col_type = json.loads(json.dumps(type_))
+        convert = converter.get(col_type)
+        assert convert.convert_column(values) == [convert(v) for v in values]
+
+    column_converters = converter.column_converters([4, 5, 9])
+    assert column_converters[0] is None
+    assert column_converters[2] is None
+    assert convert_columns(column_converters, [["a", "::1", 1]]) == [
+        ["a", IPv6Address("::1"), 1]
+    ]
+    # Without any batch implementation, rows are converted row by row.
+    assert converter.column_converters([4, 9]) is None
+
+
+def test_execute_with_column_converter(mocked_connection):
+    """
+    Verify that cursors convert rows column by column using custom batch
+    converters, and that other converters are applied value by value.
+    """
+    calls = []
+
+    def upper_column(values):
+        calls.append(list(values))
+        return [value.upper() for value in values]
+
+    converter = Converter()
+
+    @column_converter(upper_column)
+    def upper(value):
+        return value.upper()
+
+    converter.set(DataType.TEXT, upper)
+    converter.set(DataType.INTEGER, str)
+    cursor = mocked_connection.cursor(converter=converter)
+    response = {
+        "col_types": [4, 9, 3],
+        "cols": ["name", "age", "flag"],
+        "rows": [["foo", 1, True], ["bar", 2, False], ["baz", 3, None]],
+        "rowcount": 3,
+        "duration": 123,
+    }
+    with mock.patch.object(
+        mocked_connection.client, "sql", return_value=response
+    ):
+        cursor.execute("")
+        assert cursor.fetchone() == ["FOO", "1", True]
+        assert cursor.fetchall() == [["BAR", "2", False], ["BAZ", "3", None]]
+    assert calls == [["foo", "bar", "baz"]]
+    assert response["rows"][0] == ["foo", 1, True]
+
+
+@pytest.mark.parametrize(
+    "tz",
+    [
+        datetime.timezone.utc,
+        datetime.timezone(datetime.timedelta(hours=7), name="MST"),
+        zoneinfo.ZoneInfo("Europe/Berlin"),
+        pytz.timezone("Europe/Berlin"),
+        pytz.timezone("Australia/Lord_Howe"),
+        pytz.utc,
+    ],
+)
+def test_timestamp_converter(tz):
+    """
+    Verify that timestamp converters return the same values as
+    `datetime.fromtimestamp`, also around DST transitions, and that they
+    are created once per time zone.
+    """
+    convert = timestamp_converter(tz)
+    assert timestamp_converter(tz) is convert
+    # Around the DST transitions of 2024 in Europe and Australia, in steps
+    # of 7 minutes and 13.5 seconds.
+    values = [
+        start + step * 433_500
+        for start in (1711846800000, 1729990800000, 1712412000000)
+        for step in range(-40, 40)
+    ]
+    values += [-1, 0, None, 1658167836758]
+    expected = [
+        None
+        if value is None
+        else datetime.datetime.fromtimestamp(value / 1e3, tz)
+        for value in values
+    ]
+    for result in (
+        [convert(value) for value in values],
+        convert.convert_column(values),
+    ):
+        assert result == expected
+        assert [value and value.tzinfo for value in result] == [
+            value and value.tzinfo for value in expected
+        ]
+        assert [value and value.fold for value in result] == [
+            value and value.fold for value in expected
+        ]
+
+
+def test_time_zone_keeps_converter_caches(mocked_connection):
+    """
+    Verify that setting the same time zone again keeps the cached row
+    converters of the converter.
+    """
+    converter = DefaultTypeConverter()
+    cursor = mocked_connection.cursor(converter=converter, time_zone="+0530")
+    column_converters = converter.column_converters([11])
+    cursor.time_zone = "+0530"
+    assert converter.column_converters([11]) is column_converters
+    cursor.time_zone = "+0100"
+    assert converter.column_converters([11]) is not column_converters
+
+
+def test_time_zone_reset(mocked_connection):
+    """
+    Verify that resetting the time zone returns timestamps in UTC again.
+    """
+    cursor = mocked_connection.cursor(time_zone="+0530")
+    response = {"col_types": [11], "cols": ["ts"], "rows": [[1658167836758]]}
+    with mock.patch.object(
+        mocked_connection.client, "sql", return_value=response
+    ):
+        cursor.execute("")
+        assert cursor.fetchone()[0].utcoffset() == datetime.timedelta(
+            hours=5, minutes=30
+        )
+        cursor.time_zone = None
+        cursor.execute("")
+        (value,) = cursor.fetchone()
+        assert value.tzinfo is datetime.timezone.utc
+        assert value == datetime.datetime(
+            2022, 7, 18, 18, 10, 36, 758000, tzinfo=datetime.timezone.utc
+        )
+
+
+def test_time_zone_reset_keeps_other_converters(mocked_connection):
+    """
+    Verify that creating cursors without time zone, or resetting the time
+    zone, leaves converters alone which were not registered by setting a
+    time zone on the same cursor.
+    """
+    response = {"col_types": [11], "cols": ["ts"], "rows": [[1658167836758]]}
+
+    def fetchone(cursor):
+        with mock.patch.object(
+            mocked_connection.client, "sql", return_value=response
+        ):
+            cursor.execute("")
+            return cursor.fetchone()[0]
+
+    # Converters without `TIMESTAMP` mapping return raw values.
+    converter = Converter({DataType.BOOLEAN: bool})
+    assert fetchone(mocked_connection.cursor(converter=converter)) == (
+        1658167836758
+    )
+
+    # Custom `TIMESTAMP` converters are kept.
+    converter = DefaultTypeConverter()
+    converter.set(DataType.TIMESTAMP_WITH_TZ, str)
+    cursor = mocked_connection.cursor(converter=converter)
+    cursor.time_zone = None
+    assert fetchone(cursor) == "1658167836758"
+
+    # Cursors sharing a converter keep the time zone of another cursor.
+    converter = DefaultTypeConverter()
+    first = mocked_connection.cursor(converter=converter, time_zone="+0530")
+    mocked_connection.cursor(converter=converter)
+    assert fetchone(first).utcoffset() == datetime.timedelta(
+        hours=5, minutes=30
+    )
+    second = mocked_connection.cursor(converter=converter, time_zone="+0100")
+    first.time_zone = None
+    assert fetchone(second).utcoffset() == datetime.timedelta(hours=1)
+    second.time_zone = None
+    assert fetchone(first).tzinfo is datetime.timezone.utc
+
+
+def test_execute_with_intern(mocked_connection):
+    """
+    Verify that values of the given columns are interned, so that equal
+    values share one object, and that other columns are left alone.
+    """
+    cursor = mocked_connection.cursor(
+        converter=DefaultTypeConverter(), intern=["ip", "status", "ips"]
+    )
+    response = {
+        "col_types": [5, 4, 4, [100, 5]],
+        "cols": ["ip", "status", "path", "ips"],
+        "rows": [
+            ["10.0.0.1", "".join(["O", "K"]), "".join(["/", "a"]), ["::1"]],
+            ["10.0.0.1", "".join(["O", "K"]), "".join(["/", "a"]), ["::1"]],
+            [None, None, None, None],
+        ],
+        "rowcount": 3,
+        "duration": 123,
+    }
+    with mock.patch.object(
+        mocked_connection.client, "sql", return_value=response
+    ):
+        cursor.execute("")
+        first, second, third = cursor.fetchall()
+
+    assert first == [IPv4Address("10.0.0.1"), "OK", "/a", [IPv6Address("::1")]]
+    assert second == first
+    assert second[0] is first[0]
+    assert second[1] is first[1]
+    assert second[2] is not first[2]
+    assert second[3][0] is first[3][0]
+    assert third == [None, None, None, None]
+
+
+def test_execute_with_intern_unhashable(mocked_connection):
+    cursor = mocked_connection.cursor(intern=["obj"])
+    response = {
+        "col_types": [12],
+        "cols": ["obj"],
+        "rows": [[{"x": 1}]],
+        "rowcount": 1,
+        "duration": 123,
+    }
+    with mock.patch.object(
+        mocked_connection.client, "sql", return_value=response
+    ):
+        cursor.execute("")
+        with pytest.raises(ValueError, match="OBJECT can not be interned"):
+            cursor.fetchone()
+
+
 def test_executemany_with_converter(mocked_connection):
     converter = DefaultTypeConverter()
     cursor = mocked_connection.cursor(converter=converter)
@@ -765,3 +1212,139 @@ def test_cursor_closes_access(mocked_connection):
 
     with pytest.raises(ProgrammingError):
         cursor.execute("s")
+
+
+def test_fetchnumpy(mocked_connection):
+    """
+    Verify that results are fetched as typed NumPy arrays per column, with
+    masks for NULL values, and that fetching continues after fetchone().
+    """
+    np = pytest.importorskip("numpy")
+    cursor = mocked_connection.cursor(converter=DefaultTypeConverter())
+    response = {
+        "col_types": [9, 6, 11, 3, 5, [100, 9], 4],
+        "cols": ["int", "double", "ts", "bool", "ip", "ints", "text"],
+        "rows": [
+            [1, 0.5, 1658167836758, True, "10.0.0.1", [1, 2], "a"],
+            [2, None, 0, None, None, None, None],
+            [3, 1.5, None, False, "10.0.0.3", [3], "c"],
+        ],
+        "rowcount": 3,
+        "duration": 123,
+    }
+    with mock.patch.object(
+        mocked_connection.client, "sql", return_value=response
+    ):
+        cursor.execute("")
+        assert cursor.fetchone()[0] == 1
+        result = cursor.fetchnumpy()
+
+    assert result["int"].dtype == np.int32
+    assert result["int"].tolist() == [2, 3]
+    assert not isinstance(result["int"], np.ma.MaskedArray)
+    assert result["double"].dtype == np.float64
+    assert result["double"].tolist() == [None, 1.5]
+    assert result["ts"].dtype == np.dtype("datetime64[ms]")
+    assert result["ts"][0] == np.datetime64("1970-01-01T00:00:00.000")
+    assert result["ts"].mask.tolist() == [False, True]
+    assert result["bool"].tolist() == [None, False]
+    assert result["ip"].tolist() == [None, IPv4Address("10.0.0.3")]
+    assert result["ints"].shape == (2,)
+    assert result["ints"].tolist() == [None, [3]]
+    assert result["text"].tolist() == [None, "c"]
+
+    assert cursor.fetchnumpy()["int"].tolist() == []
+    assert cursor.fetchall() == []
+
+
+def test_fetchnumpy_without_result(mocked_connection):
+    cursor = mocked_connection.cursor()
+    with pytest.raises(ProgrammingError, match="No result available"):
+        cursor.fetchnumpy()
+
+
+ARROW_RESPONSE = {
+    "col_types": [9, 6, 11, 15, 24, 5, [100, 9], [100, [100, 4]], 12],
+    "cols": [
+        "int",
+        "double",
+        "ts",
+        "ts_naive",
+        "date",
+        "ip",
+        "ints",
+        "nested",
+        "obj",
+    ],
+    "rows": [
+        [1, 0.5, 1658167836758, 0, 0, "10.0.0.1", [1, 2], [["a"]], {"x": 1}],
+        [2, None, None, None, None, None, None, None, None],
+    ],
+    "rowcount": 2,
+    "duration": 123,
+}
+
+
+def test_fetch_arrow(mocked_connection):
+    """
+    Verify that results are fetched as an Arrow table, typed by the column
+    types of the response, including nested arrays.
+    """
+    pa = pytest.importorskip("pyarrow")
+    cursor = mocked_connection.cursor()
+    with mock.patch.object(
+        mocked_connection.client, "sql", return_value=ARROW_RESPONSE
+    ):
+        cursor.execute("")
+        table = cursor.fetch_arrow()
+
+    assert table.column_names == ARROW_RESPONSE["cols"]
+    assert table.schema.types == [
+        pa.int32(),
+        pa.float64(),
+        pa.timestamp("ms", tz="UTC"),
+        pa.timestamp("ms"),
+        pa.date64(),
+        pa.string(),
+        pa.list_(pa.int32()),
+        pa.list_(pa.list_(pa.string())),
+        pa.struct([("x", pa.int64())]),
+    ]
+    assert table.column("int").to_pylist() == [1, 2]
+    assert table.column("double").null_count == 1
+    assert table.column("ts")[0].as_py() == datetime.datetime(
+        2022, 7, 18, 18, 10, 36, 758000, tzinfo=datetime.timezone.utc
+    )
+    assert table.column("ints").to_pylist() == [[1, 2], None]
+    assert table.column("nested").to_pylist() == [[["a"]], None]
+    assert cursor.fetch_arrow().num_rows == 0
+
+
+def test_fetch_df(mocked_connection):
+    """
+    Verify that results are fetched as a pandas data frame, with typed
+    numeric and timestamp columns.
+    """
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    cursor = mocked_connection.cursor()
+    with mock.patch.object(
+        mocked_connection.client, "sql", return_value=ARROW_RESPONSE
+    ):
+        cursor.execute("")
+        df = cursor.fetch_df()
+
+    assert list(df.columns) == ARROW_RESPONSE["cols"]
+    assert df["int"].dtype == "int32"
+    assert df["int"].tolist() == [1, 2]
+    assert df["double"].dtype == "float64"
+    assert pd.isna(df["double"][1])
+    assert str(df["ts"].dtype) == "datetime64[ms, UTC]"
+    assert df["ts"][0] == pd.Timestamp("2022-07-18 18:10:36.758", tz="UTC")
+    assert df["ip"].tolist()[0] == "10.0.0.1"
+
+
+def test_fetch_arrow_without_result(mocked_connection):
+    cursor = mocked_connection.cursor()
+    with pytest.raises(ProgrammingError, match="No result available"):
+        cursor.fetch_arrow()
@@ -20,7 +20,9 @@
 # software solely pursuant to the terms of the relevant commercial agreement.
 
 import gzip
+import io
 import json
+import logging
 import os
 import queue
 import random
@@ -46,7 +48,11 @@ from crate.client.exceptions import (
 )
 from crate.client.http import (
     Client,
+    RetryBudget,
+    Server,
+    _AdaptiveLimit,
     _get_socket_opts,
+    _NodeMetricsSampler,
     _remove_certs_for_non_https,
 )
 from tests.conftest import REQUEST_PATH, fake_response
@@ -243,6 +249,82 @@ def test_redirect_blob_preserves_jwt_auth():
         assert call.kwargs.get("jwt_token") == "my.jwt.token"
 
 
+def test_redirect_servers_bounded_lru():
+    """
+    Verify that pools of servers added via redirects are kept in a bounded
+    LRU, and that evicted pools are closed.
+    """
+    client = Client(servers="localhost:4200")
+    client.redirect_pool_max_size = 2
+
+    client._add_server("http://localhost:4201")
+    first_pool = client.server_pool["http://localhost:4201"]
+    client._add_server("http://localhost:4202")
+    client._add_server("http://localhost:4201")
+    with patch.object(first_pool, "close") as close_first:
+        client._add_server("http://localhost:4203")
+        close_first.assert_not_called()
+
+    assert sorted(client.server_pool.keys()) == [
+        "http://localhost:4200",
+        "http://localhost:4201",
+        "http://localhost:4203",
+    ]
+    assert list(client._redirect_servers) == [
+        "http://localhost:4201",
+        "http://localhost:4203",
+    ]
+
+    # Configured servers are never added to the LRU.
+    client._add_server("http://localhost:4200")
+    assert "http://localhost:4200" not in client._redirect_servers
+
+
+def test_redirect_servers_idle_eviction():
+    """
+    Verify that idle redirect server pools are closed, and that the pool is
+    recreated on the next redirect.
+    """
+    client = Client(servers="localhost:4200")
+    client._add_server("http://localhost:4201")
+    idle_pool = client.server_pool["http://localhost:4201"]
+
+    client._redirect_servers["http://localhost:4201"] -= (
+        client.redirect_pool_idle_timeout + 1
+    )
+    with patch.object(idle_pool, "close") as close_idle:
+        client._add_server("http://localhost:4202")
+        close_idle.assert_called_once()
+    assert "http://localhost:4201" not in client.server_pool
+
+    client._add_server("http://localhost:4201")
+    assert client.server_pool["http://localhost:4201"] is not idle_pool
+
+
+def test_redirect_servers_idle_eviction_without_redirects():
+    """
+    Verify that idle redirect server pools are closed by later requests,
+    also when no further redirects happen.
+    """
+    client = Client(servers="localhost:4200")
+    client._add_server("http://localhost:4201")
+    idle_pool = client.server_pool["http://localhost:4201"]
+    client._redirect_servers["http://localhost:4201"] -= (
+        client.redirect_pool_idle_timeout + 1
+    )
+
+    response = fake_response(200)
+    response.get_redirect_location.return_value = None
+    with (
+        patch(REQUEST_PATH, return_value=response),
+        patch.object(idle_pool, "close") as close_idle,
+    ):
+        client._request("GET", "/")
+        close_idle.assert_called_once()
+    assert "http://localhost:4201" not in client.server_pool
+    assert not client._redirect_servers
+
+
 def test_server_infos():
     """
     Verify that when a `MaxRetryError` is raised, a `ConnectionError` is raised.
@@ -331,6 +413,26 @@ def test_bad_bulk_400():
             )
 
 
+def test_bulk_args_array():
+    """
+    Verify that bulk arguments given as a NumPy array are serialized as
+    nested JSON arrays, and that empty arrays are omitted.
+    """
+    np = pytest.importorskip("numpy")
+    captured = []
+
+    def capturing(*_, **kwargs):
+        captured.append(json.loads(kwargs["data"]))
+        return fake_response(200)
+
+    client = Client(servers="localhost:4200", compress=False)
+    with patch(REQUEST_PATH, side_effect=capturing):
+        client.sql("INSERT INTO t VALUES (?, ?)", None, np.eye(2, dtype=int))
+        client.sql("INSERT INTO t VALUES (?, ?)", None, np.empty((0, 2)))
+    assert captured[0]["bulk_args"] == [[1, 0], [0, 1]]
+    assert "bulk_args" not in captured[1]
+
+
 def test_socket_options_contain_keepalive():
     """
     Verify that KEEPALIVE options are present at `socket_options`
@@ -343,6 +445,59 @@ def test_socket_options_contain_keepalive():
     ]
 
 
+def test_server_request_templates():
+    """
+    Verify that the headers, path and retry policy of requests are computed
+    once per configuration, and that request headers are not mutated.
+    """
+    server = Server("http://localhost:4200/crate")
+    with patch.object(server.pool, "urlopen") as urlopen:
+        headers = {"Accept-Encoding": "gzip", "Authorization": "Bearer t"}
+        server.request(
+            "POST", "/_sql", data=b"{}", headers=headers, username="crate"
+        )
+        server.request("POST", "/_sql", data=b"{}", username="crate")
+        server.request("POST", "/_sql", username="alice", schema="doc")
+
+    first, second, third = urlopen.call_args_list
+    assert first.args == ("POST", "/crate/_sql")
+    assert first.kwargs["headers"] == {
+        "Accept-Encoding": "gzip",
+        "Authorization": "Bearer t",
+        "X-User": "crate",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Content-Length": "2",
+    }
+    assert headers == {"Accept-Encoding": "gzip", "Authorization": "Bearer t"}
+    assert second.kwargs["headers"]["Authorization"] == "Basic Y3JhdGU6"
+    assert third.kwargs["headers"]["X-User"] == "alice"
+    assert third.kwargs["headers"]["Default-Schema"] == "doc"
+    assert first.kwargs["retries"] is third.kwargs["retries"]
+    assert len(server._headers) == 2
+
+    with pytest.raises(ValueError, match="not both"):
+        server.request("GET", "/", username="crate", jwt_token="t")
+
+
+def test_server_request_templates_lru():
+    """
+    Verify that request templates are evicted least recently used first.
+    """
+    with patch.object(Server, "template_cache_size", 2):
+        server = Server("http://localhost:4200")
+    with patch.object(server.pool, "urlopen"):
+        server.request("GET", "/", username="alice")
+        server.request("GET", "/", username="bob")
+        alice = server._headers.get(("alice", None, None, None))
+        server.request("GET", "/", username="carol")
+        server.request("GET", "/", username="alice")
+
+    assert len(server._headers) == 2
+    assert server._headers.get(("alice", None, None, None)) is alice
+    assert server._headers.get(("bob", None, None, None)) is None
+
+
 def test_duplicate_key_error():
     """
     Verify that an `IntegrityError` is raised on duplicate key errors,
@@ -593,6 +748,127 @@ def test_remove_certs_for_non_https():
     assert "foobar" in d
 
 
+class EncodedResponseHandler(BaseHTTPRequestHandler):
+    """
+    Return the rows requested by the statement, encoded like given by the
+    statement, e.g. ``gzip chunked 1000``.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        *encodings, rows = json.loads(self.rfile.read(length))["stmt"].split()
+        if rows == "error":
+            body = json.dumps({"error": {"message": "failed", "code": 4000}})
+            self.send_response(400)
+        elif rows == "html":
+            body = "<html>Gateway</html>"
+            self.send_response(200)
+        else:
+            rows = [[i, "x" * 10] for i in range(int(rows))]
+            body = json.dumps({"rows": rows})
+            self.send_response(200)
+        body = body.encode("utf-8")
+        if "gzip" in encodings:
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "application/json")
+        if "chunked" in encodings:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(body), 1000):
+                chunk = body[i : i + 1000]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+def test_reuse_response_buffers(serve_http):
+    """
+    Verify that response bodies are read into reusable buffers, whatever
+    their encoding, and that the connections are reused afterwards.
+    """
+    with serve_http(EncodedResponseHandler) as (_, url):
+        client = Client(url, reuse_response_buffers=True)
+        buffers = client._response_buffers
+        for stmt in ("1", "10000", "gzip 10000", "chunked 10000"):
+            result = client.sql(stmt)
+            rows = int(stmt.split()[-1])
+            assert result["rows"] == [[i, "x" * 10] for i in range(rows)]
+        assert client.sql("gzip chunked 20000")["rows"][-1] == [19999, "x" * 10]
+        assert len(buffers._buffers) == 2
+        buffer = max(buffers._buffers, key=len)
+        client.sql("10")
+        assert buffer in buffers._buffers
+
+        with pytest.raises(ProgrammingError, match="failed"):
+            client.sql("gzip error")
+        assert client.sql("gzip 1")["rows"] == [[0, "x" * 10]]
+        with pytest.raises(ProgrammingError, match="Invalid server response"):
+            client.sql("html")
+        assert client.server_pool[url].pool.num_connections == 1
+        client.close()
+
+
+def test_reuse_response_buffers_size(serve_http):
+    """
+    Verify that buffers grow to the size of bodies of known length, but
+    not beyond.
+    """
+    with serve_http(EncodedResponseHandler) as (_, url):
+        client = Client(url, reuse_response_buffers=True)
+        buffers = client._response_buffers
+        size = len(json.dumps({"rows": [[i, "x" * 10] for i in range(8000)]}))
+        assert size > buffers.chunk_size
+        assert len(client.sql("8000")["rows"]) == 8000
+        assert [len(buffer) for buffer in buffers._buffers] == [size]
+
+        # Bodies of unknown length, filling the buffer exactly.
+        buffers._buffers = [bytearray(size)]
+        assert len(client.sql("chunked 8000")["rows"]) == 8000
+        assert [len(buffer) for buffer in buffers._buffers] == [size]
+        client.close()
+
+
+def test_sql_raw(serve_http):
+    """
+    Verify that raw results are returned, or streamed into a file-like
+    object, without decoding them, and that errors are still raised.
+    """
+    with serve_http(EncodedResponseHandler) as (_, url):
+        client = Client(url)
+        expected = json.dumps({"rows": [[0, "x" * 10], [1, "x" * 10]]})
+        assert client.sql_raw("gzip 2") == expected.encode("utf-8")
+
+        out = io.BytesIO()
+        assert client.sql_raw("chunked 2", out=out) == len(expected)
+        assert out.getvalue() == expected.encode("utf-8")
+
+        with pytest.raises(ProgrammingError, match="failed"):
+            client.sql_raw("error", out=out)
+        assert client.server_pool[url].pool.num_connections == 1
+        client.close()
+
+    response = fake_response(200, content_type="text/html")
+    with patch(REQUEST_PATH, return_value=response):
+        client = Client(servers="localhost:4200")
+        with pytest.raises(ProgrammingError, match="content-type 'text/html'"):
+            client.sql_raw("select 1")
+
+
 def test_keep_alive(serve_http):
     """
     Verify that when launching several requests, the connection is kept
@@ -768,6 +1044,40 @@ def test_credentials(serve_http):
             assert server.SHARED["jwt_token"] == jwt_token
 
 
+def test_cursor_overrides(serve_http):
+    """
+    Verify that cursors override the schema and credentials of the
+    connection per request, using the same connection pool.
+    """
+    with serve_http(SharedStateRequestHandler) as (server, url):
+        with connect(url, schema="doc", username="crate") as conn:
+            pool = conn.client.server_pool[url]
+
+            conn.cursor(schema="tenant").execute("select 1")
+            assert server.SHARED["schema"] == "tenant"
+            assert server.SHARED["username"] == "crate"
+
+            cursor = conn.cursor(username="alice", password="secret")
+            cursor.execute("select 2")
+            assert server.SHARED["schema"] == "doc"
+            assert server.SHARED["username"] == "alice"
+            assert server.SHARED["password"] == "secret"
+
+            # Tokens replace the credentials of the connection.
+            conn.cursor(jwt_token="testJwtToken").execute("select 3")
+            assert server.SHARED["jwt_token"] == "testJwtToken"
+            assert server.SHARED["usernameFromXUser"] is None
+
+            conn.cursor().execute("select 4")
+            assert server.SHARED["schema"] == "doc"
+            assert server.SHARED["username"] == "crate"
+            assert conn.client.server_pool[url] is pool
+
+            cursor = conn.cursor(username="alice", jwt_token="testJwtToken")
+            with pytest.raises(ProgrammingError, match="not both"):
+                cursor.execute("select 5")
+
+
 def test_credentials_and_token(serve_http):
     """
     Verify exception when user provides both credentials and token.
@@ -858,3 +1168,541 @@ def test_compress_default():
         Client(servers="localhost:4200").sql("SELECT 1")
     assert captured["headers"].get("Accept-Encoding") == "gzip, deflate"
     assert "Content-Encoding" not in captured["headers"]
+
+
+def test_coalesce_reads():
+    """
+    Verify that concurrent identical read-only statements share a single
+    request when `coalesce_reads` is enabled.
+    """
+    release = Event()
+    response = fake_response(200)
+    response.data = json.dumps(
+        {"cols": ["x"], "rows": [[1]], "rowcount": 1}
+    ).encode()
+
+    def slow_request(*_, **__):
+        release.wait(timeout=5)
+        return response
+
+    client = Client(servers="localhost:4200", coalesce_reads=True)
+    results = queue.Queue()
+    with patch(REQUEST_PATH, side_effect=slow_request) as mock_req:
+        threads = [
+            Thread(target=lambda: results.put(client.sql("SELECT ?", [1])))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while len(client._single_flight._calls) == 0:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert mock_req.call_count == 1
+        contents = [results.get_nowait() for _ in range(5)]
+        assert all(
+            c == {"cols": ["x"], "rows": [[1]], "rowcount": 1} for c in contents
+        )
+        assert len({id(c) for c in contents}) == 5
+
+        # Writes and differing parameters are never coalesced.
+        mock_req.reset_mock()
+        client.sql("INSERT INTO t (x) VALUES (?)", [1])
+        client.sql("SELECT ?", [2])
+        assert mock_req.call_count == 2
+
+
+def test_insert_batching():
+    """
+    Verify that concurrent identical single-row INSERT statements are
+    merged into one bulk request, and that each caller gets the outcome of
+    its own row.
+    """
+    response = fake_response(200)
+    response.data = json.dumps(
+        {
+            "cols": [],
+            "duration": 5,
+            "results": [
+                {"rowcount": 1},
+                {"rowcount": -2, "error_message": "DuplicateKeyException[]"},
+                {"rowcount": 1},
+            ],
+        }
+    ).encode()
+
+    client = Client(servers="localhost:4200", insert_batch_window=0.5)
+    stmt = "INSERT INTO t (x) VALUES (?)"
+    outcomes = {}
+
+    def pending_rows():
+        batch = client._insert_batcher._pending.get((stmt, None, None))
+        return len(batch.args) if batch else 0
+
+    def insert(value):
+        try:
+            outcomes[value] = client.sql(stmt, [value])
+        except IntegrityError as ex:
+            outcomes[value] = ex
+
+    with patch(REQUEST_PATH, return_value=response) as mock_req:
+        threads = []
+        for value in range(3):
+            thread = Thread(target=insert, args=(value,))
+            thread.start()
+            threads.append(thread)
+            # Keep the order of rows within the batch deterministic.
+            while pending_rows() <= value:
+                time.sleep(0.01)
+        for thread in threads:
+            thread.join(timeout=5)
+
+    assert mock_req.call_count == 1
+    payload = json.loads(mock_req.call_args.kwargs["data"])
+    assert payload == {"stmt": stmt, "bulk_args": [[0], [1], [2]]}
+    assert outcomes[0]["rowcount"] == 1
+    assert outcomes[2]["rowcount"] == 1
+    assert isinstance(outcomes[1], IntegrityError)
+
+
+def test_insert_batching_single_row():
+    """
+    Verify that a single batched row is sent as a regular statement.
+    """
+    response = fake_response(200)
+    response.data = json.dumps(
+        {"cols": [], "rows": [], "rowcount": 1, "duration": 1}
+    ).encode()
+    client = Client(servers="localhost:4200", insert_batch_window=0.01)
+    stmt = "INSERT INTO t (x) VALUES (?)"
+    with patch(REQUEST_PATH, return_value=response) as mock_req:
+        result = client.sql(stmt, [1])
+        client.sql("INSERT INTO t (x) VALUES (?) RETURNING x", [1])
+    assert mock_req.call_count == 2
+    payload = json.loads(mock_req.call_args_list[0].kwargs["data"])
+    assert payload == {"stmt": stmt, "args": [1]}
+    assert result["rowcount"] == 1
+
+
+def test_lanes_use_separate_pools():
+    """
+    Verify that requests of a named lane use their own server pools, with
+    the pool options configured for the lane.
+    """
+    client = Client(
+        servers="localhost:4200",
+        pool_size=10,
+        lanes={"batch": {"pool_size": 2, "timeout": 120}},
+    )
+    response = fake_response(200)
+    response.data = b'{"rows": [], "cols": []}'
+    with patch.object(
+        Server, "request", autospec=True, return_value=response
+    ) as mock_req:
+        client.sql("SELECT 1")
+        client.sql("SELECT 1", lane="batch")
+
+    default_server, batch_server = [c.args[0] for c in mock_req.call_args_list]
+    assert default_server is client.server_pool["http://localhost:4200"]
+    assert batch_server is not default_server
+    assert batch_server.pool.pool.maxsize == 2
+    assert batch_server.pool.timeout.read_timeout == 120
+
+    with pytest.raises(ProgrammingError, match="Unknown lane: 'unknown'"):
+        client.sql("SELECT 1", lane="unknown")
+
+    with pytest.raises(ValueError, match="Unknown options for lane 'batch'"):
+        Client(servers="localhost:4200", lanes={"batch": {"size": 1}})
+
+
+def test_lane_concurrency_limit():
+    """
+    Verify that the concurrency limit of a lane does not affect other
+    traffic.
+    """
+    client = Client(
+        servers="localhost:4200", lanes={"batch": {"max_concurrency": 1}}
+    )
+    release = Event()
+    response = fake_response(200)
+    response.data = b"{}"
+
+    def request(server, *_, **__):
+        if server is not client.server_pool["http://localhost:4200"]:
+            release.wait(timeout=5)
+        return response
+
+    with patch.object(Server, "request", autospec=True, side_effect=request):
+        batch = Thread(
+            target=client.sql, args=("SELECT 1", None, None, "batch")
+        )
+        batch.start()
+        _, slot = client._server_for("http://localhost:4200", "batch")
+        while slot.acquire(blocking=False):
+            slot.release()
+            time.sleep(0.01)
+
+        # The lane is saturated, while the default lane is not.
+        assert client.sql("SELECT 2") == {}
+        assert slot.acquire(timeout=0.05) is False
+
+        release.set()
+        batch.join(timeout=5)
+        assert slot.acquire(blocking=False)
+
+
+def test_lane_waits_without_adaptive_slots():
+    """
+    Verify that requests waiting for the slot of their lane do not hold
+    slots of the adaptive concurrency limit of the server.
+    """
+    client = Client(
+        servers="localhost:4200",
+        lanes={"batch": {"max_concurrency": 1}},
+        adaptive_concurrency=True,
+        concurrency_wait_timeout=0,
+    )
+    client.concurrency_limit_initial = 4
+    release = Event()
+    response = fake_response(200)
+    response.data = b"{}"
+
+    def request(server, *_, **__):
+        if server is not client.server_pool["http://localhost:4200"]:
+            release.wait(timeout=5)
+        return response
+
+    with patch.object(Server, "request", autospec=True, side_effect=request):
+        batches = [
+            Thread(target=client.sql, args=("SELECT 1", None, None, "batch"))
+            for _ in range(4)
+        ]
+        for batch in batches:
+            batch.start()
+        limit = None
+        while limit is None or limit.in_flight < 1:
+            time.sleep(0.01)
+            limit = client._concurrency_limits.get("http://localhost:4200")
+        time.sleep(0.05)
+
+        # Only the request holding the slot of the lane holds an adaptive
+        # slot, the others wait for the lane.
+        assert limit.in_flight == 1
+        assert client.sql("SELECT 2") == {}
+
+        release.set()
+        for batch in batches:
+            batch.join(timeout=5)
+    assert limit.in_flight == 0
+
+
+def test_adaptive_limit():
+    """
+    Verify that the adaptive concurrency limit grows while latencies are
+    stable, and shrinks on latency growth and overload.
+    """
+    limit = _AdaptiveLimit(initial=4, min_limit=1, max_limit=5)
+    for _ in range(50):
+        assert limit.acquire(timeout=0)
+        limit.release(0.01, overloaded=False)
+    assert limit.limit == 5
+
+    assert limit.acquire(timeout=0)
+    limit.release(1.0, overloaded=False)
+    assert limit.limit == 5 * 0.9
+
+    assert limit.acquire(timeout=0)
+    limit.release(None, overloaded=True)
+    assert limit.limit == 5 * 0.9 * 0.5
+
+    for _ in range(int(limit.limit)):
+        assert limit.acquire(timeout=0)
+    assert not limit.acquire(timeout=0)
+    assert not limit.acquire(timeout=0.01)
+
+
+def test_adaptive_limit_mixed_latencies():
+    """
+    Verify that the adaptive concurrency limit does not shrink for a mix of
+    fast and slow statements without overload.
+    """
+    rng = random.Random(1)
+    limit = _AdaptiveLimit(initial=16, min_limit=1, max_limit=256)
+    limits = []
+    for _ in range(2000):
+        assert limit.acquire(timeout=0)
+        if rng.random() < 0.3:
+            latency = 0.002
+        else:
+            latency = rng.uniform(0.005, 0.05)
+        limit.release(latency, overloaded=False)
+        limits.append(limit.limit)
+    assert min(limits) > 8
+    assert limit.limit > 16
+
+    # Growing latencies still shrink the limit.
+    for _ in range(50):
+        assert limit.acquire(timeout=0)
+        limit.release(rng.uniform(0.05, 0.5), overloaded=False)
+    assert limit.limit < 16
+
+
+def test_adaptive_concurrency_fail_fast():
+    """
+    Verify that requests fail fast when the adaptive concurrency limit of
+    a server is exhausted, and that overload responses shrink the limit.
+    """
+    client = Client(
+        servers="localhost:4200 localhost:4201",
+        adaptive_concurrency=True,
+        concurrency_wait_timeout=0,
+    )
+    client.concurrency_limit_initial = 1
+    response = fake_response(200)
+    response.data = b"{}"
+    with patch(REQUEST_PATH, return_value=response):
+        client.sql("SELECT 1")
+        client.sql("SELECT 1")
+    # Fast responses grow the limit.
+    assert client.concurrency_limits == {
+        "http://localhost:4200": 2,
+        "http://localhost:4201": 2,
+    }
+
+    limit = client._concurrency_limits["http://localhost:4200"]
+    limit.limit = 1
+    assert limit.acquire(timeout=0)
+    with pytest.raises(ConnectionError, match="Concurrency limit of server"):
+        with patch(REQUEST_PATH, return_value=response):
+            client.server_infos("http://localhost:4200")
+    limit.release(None, overloaded=False)
+
+    limit.limit = 8
+    with patch(
+        REQUEST_PATH,
+        side_effect=[fake_response(503, "Service Unavailable"), response],
+    ):
+        client.sql("SELECT 1")
+    assert client.concurrency_limits["http://localhost:4200"] == 4
+
+
+def test_node_metrics_weighted_routing():
+    """
+    Verify that node metrics sampled from `sys.nodes` are mapped to servers,
+    and weight the selection of servers away from overloaded nodes.
+    """
+    client = Client(servers="localhost:4200 localhost:4201")
+    idle = [{"name": "search", "queue": 0}]
+    busy = [{"name": "write", "queue": 500}]
+    content = {
+        "rows": [
+            ["node-1", 0.5, 4, 100, 1000, idle],
+            ["node-2", 40.0, 4, 990, 1000, busy],
+            ["node-3", 0.5, 4, 100, 1000, []],
+        ]
+    }
+    node_names = {
+        "http://localhost:4200": "node-1",
+        "http://localhost:4201": "node-2",
+    }
+    sampler = _NodeMetricsSampler(client, 1)
+    with (
+        patch.object(client, "_json_request", return_value=content) as req,
+        patch.object(
+            client,
+            "server_infos",
+            side_effect=lambda server: (server, node_names[server], "6.0.0"),
+        ) as server_infos,
+    ):
+        weights = sampler.sample(client)
+        assert sampler.sample(client) == weights
+    assert "sys.nodes" in json.loads(req.call_args.kwargs["data"])["stmt"]
+    # Node names are looked up once per server.
+    assert server_infos.call_count == 2
+    assert weights["http://localhost:4200"] == 1.0
+    assert weights["http://localhost:4201"] < 0.1
+    assert "http://localhost:4202" not in weights
+
+    # Node names missing from `sys.nodes` are looked up again, all others
+    # after `name_refresh_samples` samples.
+    node_names["http://localhost:4201"] = "node-3"
+    renamed = {"rows": content["rows"][:1] + content["rows"][2:]}
+    sampler.name_refresh_samples = 4
+    with (
+        patch.object(client, "_json_request", return_value=renamed),
+        patch.object(
+            client,
+            "server_infos",
+            side_effect=lambda server: (server, node_names[server], "6.0.0"),
+        ) as server_infos,
+    ):
+        assert sampler.sample(client) == {"http://localhost:4200": 1.0}
+        assert server_infos.call_count == 0
+        assert sampler.sample(client) == {
+            "http://localhost:4200": 1.0,
+            "http://localhost:4201": 1.0,
+        }
+        assert server_infos.call_count == 1
+        sampler.sample(client)
+        assert server_infos.call_count == 3
+
+    client._server_weights = weights
+    random.seed(42)
+    selected = [client._get_server() for _ in range(200)]
+    assert selected.count("http://localhost:4200") > 180
+    # Overloaded servers are deprioritized, but not dropped.
+    assert client.active_servers == [
+        "http://localhost:4200",
+        "http://localhost:4201",
+    ]
+
+
+def test_node_metrics_unmatched_servers(caplog):
+    """
+    Verify that a warning is logged once when no server matches a node,
+    and that servers whose node name is unknown are not weighted.
+    """
+    client = Client(servers="localhost:4200 localhost:4201")
+    content = {"rows": [["node-1", 0.5, 4, 100, 1000, []]]}
+    sampler = _NodeMetricsSampler(client, 1)
+    with (
+        patch.object(client, "_json_request", return_value=content),
+        patch.object(
+            client,
+            "server_infos",
+            side_effect=[
+                ("http://localhost:4200", "other", "6.0.0"),
+                ConnectionError("Server not available"),
+                ("http://localhost:4200", "other", "6.0.0"),
+                ("http://localhost:4201", "node-2", "6.0.0"),
+            ],
+        ) as server_infos,
+        caplog.at_level(logging.WARNING, logger="crate.client.http"),
+    ):
+        assert sampler.sample(client) == {}
+        assert sampler.sample(client) == {}
+    # Failed lookups, and names missing from `sys.nodes`, are retried.
+    assert server_infos.call_count == 4
+    warnings = [r for r in caplog.records if "matches a node" in r.message]
+    assert len(warnings) == 1
+
+
+def test_node_metrics_sampler_lifecycle():
+    """
+    Verify that the node metrics sampler runs in the background, and stops
+    when the client is closed.
+    """
+    weights = {"http://localhost:4200": 0.5}
+    with patch.object(
+        _NodeMetricsSampler, "sample", return_value=weights
+    ) as sample:
+        client = Client(servers="localhost:4200", node_metrics_interval=0.01)
+        sampler = client._node_metrics_sampler
+        while sample.call_count < 2:
+            time.sleep(0.01)
+        assert client._server_weights == weights
+        client.close()
+        sampler.join(timeout=5)
+        assert not sampler.is_alive()
+
+
+def test_locality_tiers():
+    """
+    Verify that servers of the nearest tier are preferred, and that
+    requests spill over to farther tiers when the nearer ones are dropped.
+    """
+    client = Client(
+        servers={
+            "local": "localhost:4200",
+            "zone": ["localhost:4201", "localhost:4202"],
+            "remote": ["localhost:4203"],
+        }
+    )
+    assert client._server_tiers == {
+        "http://localhost:4200": 0,
+        "http://localhost:4201": 1,
+        "http://localhost:4202": 1,
+        "http://localhost:4203": 2,
+    }
+    assert {client._get_server() for _ in range(10)} == {
+        "http://localhost:4200"
+    }
+
+    client._drop_server("http://localhost:4200", "unavailable")
+    assert [client._get_server() for _ in range(4)] == [
+        "http://localhost:4201",
+        "http://localhost:4202",
+        "http://localhost:4201",
+        "http://localhost:4202",
+    ]
+
+    client._drop_server("http://localhost:4201", "unavailable")
+    client._drop_server("http://localhost:4202", "unavailable")
+    assert client._get_server() == "http://localhost:4203"
+
+    # Restored servers of nearer tiers are preferred again.
+    client.retry_interval = 0
+    assert client._get_server() == "http://localhost:4200"
+
+
+def test_retry_budget():
+    """
+    Verify that the retry budget permits retries for a fraction of the
+    requests, and counts retries spent and denied.
+    """
+    budget = RetryBudget(ratio=0.5, min_per_second=0, capacity=2)
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert (budget.retries_spent, budget.retries_denied) == (3, 1)
+
+    unlimited = RetryBudget()
+    assert all(unlimited.withdraw() for _ in range(1000))
+    assert unlimited.retries_spent == 1000
+
+
+def test_retry_budget_exhausted():
+    """
+    Verify that failing requests are not retried against other servers once
+    the retry budget of the client is exhausted.
+    """
+    client = Client(
+        servers="localhost:4200 localhost:4201 localhost:4202",
+        retry_budget=0.1,
+    )
+    client.retry_budget = RetryBudget(ratio=0.1, min_per_second=0, capacity=1)
+    unavailable = fake_response(503, "Service Unavailable")
+    with patch(REQUEST_PATH, return_value=unavailable) as mock_req:
+        with pytest.raises(ConnectionError, match="Retry budget exhausted"):
+            client.sql("SELECT 1")
+    assert mock_req.call_count == 2
+    assert client.retry_budget.retries_spent == 1
+    assert client.retry_budget.retries_denied == 1
+
+
+def test_retry_backoff_with_jitter():
+    """
+    Verify that retries against other servers wait using full jitter
+    exponential backoff.
+    """
+    client = Client(
+        servers="localhost:4200 localhost:4201 localhost:4202",
+        backoff_factor=0.1,
+    )
+    ok = fake_response(200)
+    ok.data = b"{}"
+    unavailable = fake_response(503, "Service Unavailable")
+    with (
+        patch(REQUEST_PATH, side_effect=[unavailable, unavailable, ok]),
+        patch("crate.client.http.sleep") as sleep,
+        patch("crate.client.http.random.uniform", side_effect=lambda a, b: b),
+    ):
+        client.sql("SELECT 1")
+    assert [c.args[0] for c in sleep.call_args_list] == [0.1, 0.2]
+    assert client.retry_budget.retries_spent == 2
@@ -0,0 +1,159 @@
+import json
+import socket
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import quote
+
+import pytest
+import urllib3
+
+from crate.client import connect
+from crate.client.http import Client
+from crate.client.proxy import create_proxy
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """
+    Echo the SQL statement and the forwarded headers, like CrateDB would
+    return a single row.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_json({"version": {"number": "5.0.0"}, "name": "upstream"})
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        payload = json.loads(self.rfile.read(length))
+        self.send_json(
+            {
+                "cols": ["stmt", "schema", "user"],
+                "rows": [
+                    [
+                        payload["stmt"],
+                        self.headers.get("Default-Schema"),
+                        self.headers.get("X-User"),
+                    ]
+                ],
+                "rowcount": 1,
+                "duration": 1,
+            }
+        )
+
+    def send_json(self, content):
+        response = json.dumps(content).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+@contextmanager
+def run_proxy(upstream, **kwargs):
+    client = Client(upstream)
+    proxy = create_proxy(client, **kwargs)
+    thread = threading.Thread(target=proxy.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield proxy
+    finally:
+        proxy.shutdown()
+        proxy.server_close()
+        client.close()
+        thread.join()
+
+
+def test_proxy_tcp(serve_http):
+    with serve_http(UpstreamHandler) as (_, upstream):
+        with run_proxy(upstream, listen=("127.0.0.1", 0)) as proxy:
+            host, port = proxy.server_address
+            with connect(
+                f"http://{host}:{port}", schema="doc", username="crate"
+            ) as conn:
+                cursor = conn.cursor()
+                for _ in range(3):
+                    cursor.execute("select 1")
+                    assert cursor.fetchall() == [["select 1", "doc", "crate"]]
+
+
+def test_proxy_unix_socket(serve_http, tmp_path):
+    path = str(tmp_path / "proxy.sock")
+    with serve_http(UpstreamHandler) as (_, upstream):
+        with run_proxy(upstream, unix_socket=path):
+            with connect("http+unix://" + quote(path, safe="")) as conn:
+                cursor = conn.cursor()
+                cursor.execute("select 1")
+                assert cursor.fetchall() == [["select 1", None, None]]
+
+
+def test_proxy_errors(serve_http):
+    with serve_http(UpstreamHandler) as (server, upstream):
+        with run_proxy(upstream, listen=("127.0.0.1", 0)) as proxy:
+            host, port = proxy.server_address
+            url = f"http://{host}:{port}"
+            response = urllib3.request("GET", url + "/_nodes")
+            assert response.status == 404
+            assert "Unsupported path" in response.json()["error"]["message"]
+
+            server.shutdown()
+            server.server_close()
+            response = urllib3.request(
+                "POST", url + "/_sql", body=b'{"stmt": "select 1"}'
+            )
+            assert response.status == 503
+            assert (
+                "No more Servers available"
+                in response.json()["error"]["message"]
+            )
+
+
+def send_raw(address, request: bytes) -> bytes:
+    """
+    Send a raw request, and read the response until the connection is
+    closed.
+    """
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(request)
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+        return response
+
+
+@pytest.mark.parametrize(
+    "request_line, headers, status",
+    [
+        ("POST /unsupported", "Content-Length: {length}", 404),
+        ("POST /_sql", "Transfer-Encoding: chunked", 411),
+        ("POST /_sql", "Content-Length: abc", 400),
+    ],
+)
+def test_proxy_rejects_without_reading_body(
+    serve_http, request_line, headers, status
+):
+    """
+    Verify that rejected requests close the connection, so that their body
+    is not forwarded as another request.
+    """
+    smuggled = b"GET /_sql HTTP/1.1\r\nHost: x\r\n\r\n"
+    headers = headers.format(length=len(smuggled))
+    request = (
+        f"{request_line} HTTP/1.1\r\nHost: x\r\n{headers}\r\n\r\n"
+    ).encode() + smuggled
+    with serve_http(UpstreamHandler) as (_, upstream):
+        with run_proxy(upstream, listen=("127.0.0.1", 0)) as proxy:
+            response = send_raw(proxy.server_address, request)
+    assert response.startswith(f"HTTP/1.1 {status} ".encode())
+    assert response.count(b"HTTP/1.1 ") == 1
+    assert b"Connection: close" in response
+
+
+def test_create_proxy_requires_one_address():
+    with pytest.raises(ValueError):
+        create_proxy(Client(), listen=None, unix_socket=None)
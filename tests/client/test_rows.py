@@ -0,0 +1,244 @@
+# -*- coding: utf-8; -*-
+#
+# Licensed to CRATE Technology GmbH ("Crate") under one or more contributor
+# license agreements.  See the NOTICE file distributed with this work for
+# additional information regarding copyright ownership.  Crate licenses
+# this file to you under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.  You may
+# obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# However, if you have executed another commercial license agreement
+# with Crate these terms will supersede the license and you may use the
+# software solely pursuant to the terms of the relevant commercial agreement.
+
+import gc
+import weakref
+from ipaddress import IPv4Address
+from unittest import mock
+
+import pytest
+
+from crate.client.converter import DataType, DefaultTypeConverter
+from crate.client.rows import (
+    LazyRow,
+    Record,
+    dict_row,
+    lazy_row,
+    namedtuple_row,
+    record_row,
+    tuple_row,
+)
+
+RESPONSE = {
+    "col_types": [4, 5, [100, 5], 9],
+    "cols": ["name", "ip", "ips", "hits"],
+    "rows": [
+        ["foo", "10.0.0.1", ["10.0.0.2"], 1],
+        ["bar", None, None, 2],
+    ],
+    "rowcount": 2,
+    "duration": 123,
+}
+
+
+def fetch_rows(connection, row_factory, response=RESPONSE, **kwargs):
+    cursor = connection.cursor(row_factory=row_factory, **kwargs)
+    with mock.patch.object(connection.client, "sql", return_value=response):
+        cursor.execute("")
+        return cursor.fetchall()
+
+
+def fetch_lazy_rows(connection, **kwargs):
+    return fetch_rows(connection, lazy_row, **kwargs)
+
+
+def test_lazy_row(mocked_connection):
+    """
+    Verify that lazy rows convert values when they are accessed by index or
+    by name, and cache converted values.
+    """
+    convert_ip = mock.Mock(
+        side_effect=lambda value: value and IPv4Address(value)
+    )
+    converter = DefaultTypeConverter()
+    converter.set(DataType.IP, convert_ip)
+    first, second = fetch_lazy_rows(mocked_connection, converter=converter)
+
+    assert isinstance(first, LazyRow)
+    assert first[0] == "foo"
+    assert first.hits == 1
+    convert_ip.assert_not_called()
+
+    assert first["ip"] == IPv4Address("10.0.0.1")
+    assert first.ip is first[1]
+    assert first[-3] is first[1]
+    assert convert_ip.call_count == 1
+
+    assert first == [
+        "foo",
+        IPv4Address("10.0.0.1"),
+        [IPv4Address("10.0.0.2")],
+        1,
+    ]
+    assert first[1:3] == [IPv4Address("10.0.0.1"), [IPv4Address("10.0.0.2")]]
+    assert len(first) == 4
+    assert first.keys() == ("name", "ip", "ips", "hits")
+    assert list(second) == ["bar", None, None, 2]
+    assert "bar" in second
+    assert repr(second) == "LazyRow(['bar', None, None, 2])"
+
+
+def test_lazy_row_errors(mocked_connection):
+    (row, _) = fetch_lazy_rows(mocked_connection)
+    with pytest.raises(IndexError):
+        row[4]
+    with pytest.raises(KeyError):
+        row["unknown"]
+    with pytest.raises(AttributeError, match="no column 'unknown'"):
+        row.unknown  # noqa: B018
+    with pytest.raises(TypeError, match="unhashable"):
+        hash(row)
+
+
+def test_lazy_row_without_converter(mocked_connection):
+    """
+    Verify that lazy rows return values as they are, without converter.
+    """
+    (row, _) = fetch_lazy_rows(mocked_connection)
+    assert row == ["foo", "10.0.0.1", ["10.0.0.2"], 1]
+    assert row.ips is RESPONSE["rows"][0][2]
+
+
+@pytest.mark.parametrize(
+    "converter", [None, DefaultTypeConverter()], ids=["raw", "converted"]
+)
+def test_row_factories(mocked_connection, converter):
+    """
+    Verify that the built-in row factories create rows of their type, with
+    or without converter.
+    """
+    ip = "10.0.0.1" if converter is None else IPv4Address("10.0.0.1")
+    ips = ["10.0.0.2"] if converter is None else [IPv4Address("10.0.0.2")]
+    values = ("foo", ip, ips, 1)
+
+    (row, _) = fetch_rows(mocked_connection, tuple_row, converter=converter)
+    assert row == values
+
+    (row, _) = fetch_rows(mocked_connection, dict_row, converter=converter)
+    assert row == {"name": "foo", "ip": ip, "ips": ips, "hits": 1}
+
+    (row, _) = fetch_rows(
+        mocked_connection, namedtuple_row, converter=converter
+    )
+    assert row == values
+    assert (row.name, row.ip, row.hits) == ("foo", ip, 1)
+
+    (row, second) = fetch_rows(
+        mocked_connection, record_row, converter=converter
+    )
+    assert isinstance(row, Record)
+    assert row == values
+    assert (row.name, row.ip, row.ips, row.hits) == ("foo", ip, ips, 1)
+    assert row[1] == ip
+    assert len(row) == 4
+    assert row._asdict() == {"name": "foo", "ip": ip, "ips": ips, "hits": 1}
+    assert repr(second) == "Row(name='bar', ip=None, ips=None, hits=2)"
+    assert not hasattr(row, "__dict__")
+
+
+def test_row_factories_with_column_converter(mocked_connection):
+    """
+    Verify that row factories are applied when converting rows column by
+    column.
+    """
+    converter = DefaultTypeConverter()
+    converter.set(DataType.INTEGER, str)
+    (row, _) = fetch_rows(
+        mocked_connection, record_row, converter=converter, intern={"name"}
+    )
+    assert row == (
+        "foo",
+        IPv4Address("10.0.0.1"),
+        [IPv4Address("10.0.0.2")],
+        "1",
+    )
+    (row, _) = fetch_rows(
+        mocked_connection, tuple_row, converter=converter, intern={"name"}
+    )
+    assert row == (
+        "foo",
+        IPv4Address("10.0.0.1"),
+        [IPv4Address("10.0.0.2")],
+        "1",
+    )
+
+
+def test_row_factories_cached_per_columns(mocked_connection):
+    """
+    Verify that row classes and compiled row converters are created once
+    per description of the columns.
+    """
+    converter = DefaultTypeConverter()
+    converter.set(DataType.IP, lambda value: value and IPv4Address(value))
+    first = fetch_rows(mocked_connection, record_row, converter=converter)
+    second = fetch_rows(mocked_connection, record_row, converter=converter)
+    assert type(first[0]) is type(second[0])
+    assert len(converter._row_converters) == 1
+
+    (row, _) = fetch_rows(
+        mocked_connection,
+        namedtuple_row,
+        response={**RESPONSE, "cols": ["name", "ip", "ips", "name"]},
+    )
+    assert row._fields == ("name", "ip", "ips", "_3")
+    assert type(row) is not type(first[0])
+
+
+def test_custom_row_factory_not_cached(mocked_connection):
+    """
+    Verify that row factories returning a new function per result reuse
+    the compiled row converter, without keeping the functions alive.
+    """
+    converter = DefaultTypeConverter()
+    converter.set(DataType.IP, lambda value: value and IPv4Address(value))
+    make_rows = []
+
+    def row_factory(cursor):
+        def make_row(values):
+            return ("row", *values)
+
+        make_rows.append(weakref.ref(make_row))
+        return make_row
+
+    with mock.patch("crate.client.converter.exec", create=True) as exec_:
+        exec_.side_effect = exec
+        for _ in range(3):
+            (row, _) = fetch_rows(
+                mocked_connection, row_factory, converter=converter
+            )
+        assert exec_.call_count == 1
+    assert row[:3] == ("row", "foo", IPv4Address("10.0.0.1"))
+    assert len(converter._row_converters) == 1
+    gc.collect()
+    assert all(ref() is None for ref in make_rows)
+
+
+def test_record_renames_columns(mocked_connection):
+    response = {
+        **RESPONSE,
+        "cols": ["count(*)", "class", "_id", "class"],
+    }
+    (row, _) = fetch_rows(mocked_connection, record_row, response=response)
+    assert row._fields == ("_0", "_1", "_2", "_3")
+    assert row._3 == 1
+    assert type(row)("a", "b", "c", "d") == ("a", "b", "c", "d")
+    with pytest.raises(TypeError, match="takes 4 values, got 1"):
+        type(row)("a")
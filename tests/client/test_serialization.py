@@ -26,13 +26,16 @@ Tests for serializing data, typically python objects
 
 import datetime
 import datetime as dt
+import json
 import uuid
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from crate.client.connection import connect
 from crate.client.http import Client, json_dumps
+from crate.client.serialization import MsgspecBackend, get_json_backend
 from tests.conftest import REQUEST_PATH, fake_response
 
 
@@ -46,7 +49,7 @@ def test_data_is_serialized():
     """
     mock = MagicMock(spec=bytes)
 
-    with patch("crate.client.http.json_dumps", return_value=mock) as f:
+    with patch("crate.client.serialization.json_dumps", return_value=mock) as f:
         with patch(REQUEST_PATH, return_value=fake_response(200)) as request:
             client = Client(servers="localhost:4200")
             client.sql(
@@ -174,3 +177,86 @@ def test_uuid_serialization():
     data = uuid.UUID(bytes=uuid_int.to_bytes(16, byteorder="big"), version=4)
     result = json_dumps(data)
     assert result == b'"260df019-a183-431f-ad46-115ccdf12a5f"'
+
+
+@pytest.mark.parametrize("name", ["orjson", "json", "msgspec"])
+def test_json_backends(name):
+    """
+    Verify that all JSON backends encode payloads like `json_dumps`, and
+    decode responses given as any bytes-like object.
+    """
+    if name == "msgspec":
+        pytest.importorskip("msgspec")
+    backend = get_json_backend(name)
+    data = {
+        "stmt": "insert into t (a, b, c, d) values (?, ?, ?, ?)",
+        "args": [
+            dt.datetime(2015, 2, 28, 7, 31, 40),
+            dt.date(2015, 2, 28),
+            Decimal("0.1"),
+            uuid.UUID(int=1),
+            float("nan"),
+            [float("inf"), 1.5],
+        ],
+    }
+    encoded = backend.dumps(data)
+    assert b"NaN" not in encoded and b"Infinity" not in encoded
+    assert json.loads(encoded) == json.loads(json_dumps(data))
+    assert json.loads(encoded)["args"][4:] == [None, [None, 1.5]]
+
+    np = pytest.importorskip("numpy")
+    bulk_args = np.array([[1.0, np.nan], [np.inf, 2.0]])
+    assert json.loads(backend.dumps({"bulk_args": bulk_args})) == {
+        "bulk_args": [[1.0, None], [None, 2.0]]
+    }
+
+    content = b'{"cols": ["a"], "rows": [[1, "b", null, 1.5]]}'
+    expected = {"cols": ["a"], "rows": [[1, "b", None, 1.5]]}
+    assert backend.loads(content) == expected
+    assert backend.loads(memoryview(bytearray(content))) == expected
+
+
+def test_msgspec_backend_connect():
+    """
+    Verify that the msgspec backend decodes both the server information
+    requested when connecting, and the results fetched by cursors.
+    """
+    pytest.importorskip("msgspec")
+    root = fake_response(200)
+    root.data = b'{"name": "crate", "version": {"number": "6.0.0"}}'
+    result = fake_response(200)
+    result.data = b'{"cols": ["a"], "rows": [[1], [2]], "rowcount": 2}'
+    with patch(REQUEST_PATH, side_effect=[root, result]):
+        connection = connect("localhost:4200", json_backend=MsgspecBackend())
+        assert connection.lowest_server_version.version == (6, 0, 0)
+        cursor = connection.cursor()
+        cursor.execute("SELECT a FROM t")
+        assert cursor.fetchall() == [[1], [2]]
+        assert cursor.rowcount == 2
+
+
+def test_client_json_backend():
+    """
+    Verify that the client encodes and decodes using its JSON backend.
+    """
+
+    class Backend:
+        name = "custom"
+
+        def dumps(self, obj):
+            return b"payload"
+
+        def loads(self, data):
+            return {"rows": [[data.decode()]]}
+
+    response = fake_response(200)
+    response.data = b"response"
+    with patch(REQUEST_PATH, return_value=response) as request:
+        client = Client(servers="localhost:4200", json_backend=Backend())
+        assert client.sql("select 1") == {"rows": [["response"]]}
+    assert request.call_args.kwargs["data"] == b"payload"
+
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        Client(servers="localhost:4200", json_backend="yaml")
+    with pytest.raises(TypeError, match="must implement"):
+        Client(servers="localhost:4200", json_backend=object())